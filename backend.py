@@ -1,5 +1,10 @@
 import os
 import re
+import json
+import math
+import hashlib
+import sqlite3
+import time
 from time import perf_counter
 import sys
 import signal
@@ -7,15 +12,32 @@ import traceback
 import getpass
 import subprocess
 from pathlib import Path
-from urllib.parse import urljoin
+from functools import lru_cache
+from importlib import metadata
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from rapidfuzz import fuzz, process
+import numpy as np
 from datetime import datetime, date
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
 from dotenv import load_dotenv, set_key
 from tkinter import messagebox, Tk
 from playwright.sync_api import sync_playwright, Page, TimeoutError as PlaywrightTimeout, Error as PlaywrightError
+from playwright.async_api import async_playwright
+from parsers import (
+    WORK_ORDER_NOTE_FIELDS, KeywordMatcher, TaskRow, WorkOrder, benchmark_parsers,
+    build_task_form_post,
+    page_record_ids, parse_main_view_src, parse_task_list_html, parse_task_page_html,
+    parse_work_order_html, parse_work_order_rows_html, span_has_notes,
+)
 import argparse
+import asyncio
+import heapq
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 def get_project_root() -> str: #Returns the root directory of the project as a string path.
     # return string path for PROJECT_ROOT
@@ -43,13 +65,19 @@ ENV_PATH    = os.path.join(MISC_DIR, ".env")
 BROWSERS    = os.path.join(PROJECT_ROOT, "browsers")
 LOG_FOLDER  = os.path.join(PROJECT_ROOT, "logs")
 LOG_FILE    = os.path.join(LOG_FOLDER, "consulation_log.txt")
+CHROMIUM_MANIFEST = os.path.join(BROWSERS, "chromium_manifest.json")
 STATE_PATH = os.path.join(MISC_DIR, "state.json")
+RESOURCE_SIZES_PATH = os.path.join(MISC_DIR, "resource_sizes.json")
+WO_CACHE_PATH = os.path.join(MISC_DIR, "wo_cache.sqlite3")
+CLASSIFY_CACHE_PATH = os.path.join(MISC_DIR, "classify_cache.sqlite3")
+RULES_PATH = os.path.join(MISC_DIR, "job_type_rules.json")
 
 
 UPDATE_MODE = None
 
 # ensure folders exist
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+os.makedirs(MISC_DIR, exist_ok=True)
 os.makedirs(LOG_FOLDER, exist_ok=True)
 os.makedirs(BROWSERS, exist_ok=True)
 
@@ -65,30 +93,383 @@ __version__ = "0.1.3" # 0.2 will be with fuzzy keyword matching
 
 def normalize_string(s):
     return re.sub(r'[^a-z0-9 ]+', '', s.lower()).strip()
-JOB_TYPE_CATEGORIES = {
-    "Free": {
-        normalize_string(x) for x in [
+
+RULES_VERSION = 1
+
+# built-in job-type rules; written to RULES_PATH when it doesn't exist yet
+DEFAULT_RULES = {
+    "version": RULES_VERSION,
+    "categories": {
+        "Free": [
             "WiFi Survey", "NID/IW/CopperTest", "equipment check", "swap router",
             "ONT Swap", "STB to ONN Conversion", "Jack/FXS/Phone Check", "Blank",
             "Go-Live", "Install", "rouge ont", "onn swap", "ont dying", "stb swap",
             "Tie down", "onn"
-        ]
-    },
-    "Billable": {
-        normalize_string(x) for x in [
+        ],
+        "Billable": [
             "ONT Move", "ONT in Disco", "Fiber Cut", "Broken Fiber", "Fiber Move"
-        ]
+        ],
+        "Unknown": []
     },
-    "Unknown": set()
+    # [job type, whole words only, keywords], highest priority first
+    "keyword_rules": [
+        ["Consultation",      False, ["courtesy dispatch", "no charge"]],
+        ["Phone Check",       True,  ["phone check", "jack", "fxs", "dial tone", "no dial tone"]],
+        ["Go-Live",           False, ["go live", "activate", "turn up"]],
+        ["Speed Test",        False, ["speed test", "throughput", "latency"]],
+        ["NID/IW/CopperTest", False, ["nid", "modem swap"]],
+    ],
+    "major_types": [
+        "ONT In Disco", "ONT Move", "ONT Swap", "WiFi Survey",
+        "Go-Live", "NID/IW/CopperTest", "IW Tie Down", "Onn Install",
+        "Equipment Check/ONT Swap"
+    ],
+}
+
+JOB_TYPE_CATEGORIES = {
+    name: {normalize_string(x) for x in values}
+    for name, values in DEFAULT_RULES["categories"].items()
 }
 
 
-class PlaywrightDriver:
+def _glob_to_regex(glob):
+    # Playwright-style URL globs: ** spans "/", * does not, {a,b} alternates
+    out, i = [], 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "{":
+            end = glob.index("}", i)
+            out.append("(?:" + "|".join(re.escape(p) for p in glob[i + 1:end].split(",")) + ")")
+            i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("".join(out) + r"(?:\?.*)?$", re.IGNORECASE)
+
+
+class RequestPolicy:
+    """
+    Decides which requests a page may make: blocks by resource type, by
+    URL glob, and anything loaded by a child frame outside `frames`.
+    Keeps per-run counters of what was blocked. Blocked requests never
+    download, so their sizes are learned in a calibration run
+    (calibrate=True), which lets everything through, counts what would have
+    been blocked and remembers those responses' sizes in
+    RESOURCE_SIZES_PATH (at most `max_sizes` URLs) for later runs.
+    """
+    BLOCKED_TYPES = ("image", "stylesheet", "font", "media")
+    BLOCKED_URLS  = ("**/*.{png,svg,gif,jpg,jpeg,ico,css,woff,woff2,ttf}",)
+    FRAMES        = ("MainView",)
+    SIZES_VERSION = 2
+
+    def __init__(self,
+                 blocked_types=BLOCKED_TYPES,
+                 blocked_urls=BLOCKED_URLS,
+                 frames=FRAMES,
+                 sizes_path: str = RESOURCE_SIZES_PATH,
+                 calibrate: bool = False,
+                 max_sizes: int = 2000):
+        self.blocked_types = set(blocked_types)
+        self.url_patterns = [_glob_to_regex(g) for g in blocked_urls]
+        self.frames = set(frames)
+        self.sizes_path = sizes_path
+        self.calibrate = calibrate
+        self.max_sizes = max_sizes
+        self.blocked = Counter()
+        self.blocked_bytes = 0
+        self.measured_bytes = 0
+        self.allowed = 0
+        self._dirty = False
+        self._sizes = {}
+        try:
+            with open(sizes_path, encoding="utf-8") as f:
+                saved = json.load(f)
+            # older files held every allowed URL; start those over
+            if saved.get("version") == self.SIZES_VERSION:
+                self._sizes = saved["sizes"]
+        except (OSError, ValueError, AttributeError, KeyError):
+            pass
+
+    def decide(self, request):
+        """Return the reason to block `request`, or None to let it through."""
+        rtype = request.resource_type
+        if rtype in self.blocked_types:
+            return rtype
+        if any(p.match(request.url) for p in self.url_patterns):
+            return "url"
+        try:
+            frame = request.frame
+        except PlaywrightError:
+            # service-worker requests have no frame
+            return None
+        if frame.parent_frame is not None and frame.name not in self.frames:
+            return "frame"
+        return None
+
+    def _count(self, request, reason):
+        if reason:
+            self.blocked[reason] += 1
+            self.blocked_bytes += self._sizes.get(request.url, 0)
+        else:
+            self.allowed += 1
+        return reason
+
+    def handle(self, route):
+        if self._count(route.request, self.decide(route.request)) and not self.calibrate:
+            route.abort()
+        else:
+            route.continue_()
+
+    async def handle_async(self, route):
+        if self._count(route.request, self.decide(route.request)) and not self.calibrate:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def record_response(self, response):
+        # only calibration runs download what the policy blocks
+        if not self.calibrate or not self.decide(response.request):
+            return
+        length = response.headers.get("content-length")
+        if not (length and length.isdigit()):
+            return
+        self.measured_bytes += int(length)
+        # most recently seen last, so the cap drops the stalest URLs
+        self._sizes.pop(response.url, None)
+        self._sizes[response.url] = int(length)
+        while len(self._sizes) > self.max_sizes:
+            del self._sizes[next(iter(self._sizes))]
+        self._dirty = True
+
+    def report(self):
+        total = sum(self.blocked.values())
+        by_reason = ", ".join(f"{k}={v}" for k, v in self.blocked.most_common())
+        if self.calibrate:
+            log_message(f"🧱 Calibration: {total} request(s) would be blocked, "
+                        f"{self.measured_bytes / 1024:.0f} KB measured"
+                        f"{' — ' + by_reason if by_reason else ''}; allowed {self.allowed}")
+        else:
+            log_message(f"🧱 Blocked {total} request(s) (~{self.blocked_bytes / 1024:.0f} KB known)"
+                f"{' — ' + by_reason if by_reason else ''}; allowed {self.allowed}")
+        if not self._dirty:
+            return
+        try:
+            with open(self.sizes_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.SIZES_VERSION, "sizes": self._sizes}, f)
+            self._dirty = False
+        except OSError:
+            pass
+
+
+def is_menu_shell(url):
+    return urlsplit(url or "").path.endswith("menu.php")
+
+class MainViewRoutes:
+    """
+    Learns how a menu.php shell URL maps onto the iframe#MainView content
+    URL it embeds, per tabid and parameter set, so later navigations can
+    load the content page directly and skip the menu, tab bar and their
+    assets. A route is only trusted once two shells with different values
+    have been seen: a content parameter becomes a placeholder only if it
+    followed exactly one shell parameter across both, stays a constant if
+    it did not change, and anything else leaves the shell in use. A shell
+    parameter the route does not substitute must match the learned value,
+    and a direct load must pass verify(), so it never shows other data.
+    """
+    # shell parameters naming the record a content page shows, checked by verify()
+    RECORD_PARAMS = {
+        "taskid": "task_id", "ntaskid": "task_id",
+        "customerid": "cid", "cid": "cid",
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = {}         # route key → (content URL parts, shell query) last learned
+        self._routes = {}       # route key → (content URL parts, params, learned shell query)
+        self.direct = self.fallbacks = 0
+
+    @staticmethod
+    def _key(query):
+        return query.get("tabid", ""), tuple(sorted(query))
+
+    @staticmethod
+    def _derive(first, second):
+        """Route params from two (content, shell) observations, or None."""
+        (content1, shell1), (content2, shell2) = first, second
+        if content1._replace(query="") != content2._replace(query=""):
+            return None
+        values1 = parse_qsl(content1.query, keep_blank_values=True)
+        values2 = parse_qsl(content2.query, keep_blank_values=True)
+        if [name for name, _ in values1] != [name for name, _ in values2]:
+            return None
+        params = []
+        for (name, value1), (_, value2) in zip(values1, values2):
+            if value1 == value2:
+                params.append((name, None, value2))
+                continue
+            sources = [p for p in shell2 if shell1[p] == value1 and shell2[p] == value2]
+            if len(sources) != 1:
+                return None     # changed, but not with exactly one shell parameter
+            params.append((name, sources[0], value2))
+        return params
+
+    def learn(self, shell_url, content_url):
+        if not is_menu_shell(shell_url) or is_menu_shell(content_url):
+            return
+        shell = dict(parse_qsl(urlsplit(shell_url).query, keep_blank_values=True))
+        seen = (urlsplit(content_url), shell)
+        key = self._key(shell)
+        with self._lock:
+            first = self._seen.get(key)
+            if first is not None and first[1] == shell:
+                return          # the same shell again tells us nothing new
+            self._seen[key] = seen
+        params = self._derive(first, seen) if first is not None else None
+        with self._lock:
+            if params is None:
+                self._routes.pop(key, None)
+            else:
+                self._routes[key] = (seen[0], params, shell)
+
+    def resolve(self, shell_url):
+        """Direct content URL for a menu.php shell URL, or None."""
+        if not is_menu_shell(shell_url):
+            return None
+        shell = dict(parse_qsl(urlsplit(shell_url).query, keep_blank_values=True))
+        with self._lock:
+            route = self._routes.get(self._key(shell))
+        if route is None:
+            return None
+        content, params, learned = route
+        used = {source for _, source, _ in params if source}
+        if any(shell[name] != learned[name] for name in shell if name not in used):
+            return None
+        query = urlencode([(name, shell[source] if source else value)
+                           for name, source, value in params])
+        return urlunsplit(content._replace(query=query))
+
+    def verify(self, shell_url, html):
+        """
+        Whether directly loaded content `html` shows the record `shell_url`
+        names: the task ID and customer ID on the page must match the
+        shell's task/customer parameters where both are present.
+        """
+        ids = page_record_ids(html)
+        for name, value in parse_qsl(urlsplit(shell_url).query):
+            field = self.RECORD_PARAMS.get(name.lower())
+            shown = getattr(ids, field) if field else None
+            if shown is not None and shown != value:
+                log_message(f"⚠️ Direct MainView load showed {field} {shown!r}, "
+                            f"expected {value!r}")
+                return False
+        return True
+
+    def confirm(self, shell_url, ok):
+        """Record how a direct load went; a failed route is forgotten."""
+        with self._lock:
+            if ok:
+                self.direct += 1
+                return True
+            self.fallbacks += 1
+            shell = dict(parse_qsl(urlsplit(shell_url).query, keep_blank_values=True))
+            self._routes.pop(self._key(shell), None)
+        log_message(f"↩️ Direct MainView load failed for {shell_url!r}; using menu.php")
+        return False
+
+    def report(self):
+        log_message(f"🧭 MainView: {self.direct} direct load(s), "
+                    f"{self.fallbacks} fallback(s) to menu.php", True)
+
+main_view_routes = MainViewRoutes()
+
+
+class PageDriver:
+    """Driver-shaped wrapper around a single page."""
+    def __init__(self, page):
+        self.page = page
+        self._track(page)
+
+    def _track(self, page):
+        """Follow the content frame via framenavigated, for main_view()."""
+        self._view = None
+        page.on("framenavigated", self._frame_navigated)
+
+    def _frame_navigated(self, frame):
+        if frame.parent_frame is None:
+            # a shell's content arrives with its MainView navigation
+            self._view = None if is_menu_shell(frame.url) else frame
+        elif frame.name == "MainView":
+            self._view = frame
+
+    def goto(self, url: str, *, timeout: int = 5_000, wait_until: str = "load"):
+        """
+        Navigate to `url`. For a menu.php shell whose content URL is known,
+        the content page is loaded directly, with the shell as fallback
+        (also when the direct load times out or fails outright).
+        """
+        direct = main_view_routes.resolve(url)
+        if direct:
+            try:
+                response = self._goto(direct, timeout, wait_until)
+                ok = (response is not None and response.ok
+                      and "login.php" not in self.page.url
+                      and main_view_routes.verify(url, self.page.content()))
+            except PlaywrightError as e:
+                # PlaywrightTimeout is a PlaywrightError too
+                log_message(f"⚠️ Direct load of {direct!r} failed — {e}")
+                response, ok = None, False
+            if main_view_routes.confirm(url, ok):
+                return response
+
+        response = self._goto(url, timeout, wait_until)
+        frame = self.page.frame(name="MainView")
+        if frame and frame.url.startswith("http"):
+            main_view_routes.learn(url, frame.url)
+        return response
+
+    def _goto(self, url, timeout, wait_until):
+        try:
+            return self.page.goto(url, timeout=timeout, wait_until=wait_until)
+        except PlaywrightTimeout:
+            # fallback to load event if even DOMContentLoaded hung
+            return self.page.goto(url, timeout=timeout, wait_until="load")
+
+    def main_view(self, timeout: int = 10_000):
+        """
+        Frame holding the page content: iframe#MainView under a menu.php
+        shell, or the page itself when the content was loaded directly.
+        The handle tracked from navigation events is returned as is; only a
+        shell whose MainView has not navigated yet is waited for.
+        """
+        view = self._view
+        if view is not None and not view.is_detached():
+            return view
+        if not is_menu_shell(self.page.url):
+            return self.page.main_frame
+        self.page.wait_for_selector("iframe#MainView", timeout=timeout)
+        return self.page.frame(name="MainView") or self.page.main_frame
+
+    def view_locator(self, selector: str):
+        """Locator for `selector` inside main_view()."""
+        return self.main_view().locator(selector)
+
+    def __getattr__(self, name):
+        return getattr(self.page, name)
+
+
+class PlaywrightDriver(PageDriver):
     def __init__(self,
                  headless: bool = True,
                  playwright=None,
                  browser=None,
-                 state_path: str = STATE_PATH):
+                 state_path: str = STATE_PATH,
+                 policy: RequestPolicy = None):
         # If the caller passed us a playwright/browser, use those
         if playwright and browser:
             self._pw = playwright
@@ -98,31 +479,39 @@ class PlaywrightDriver:
             self._pw = sync_playwright().start()
             self.browser = self._pw.chromium.launch(headless=headless)
 
+        self.policy = policy or RequestPolicy()
+
         # load or create context
         if Path(state_path).exists():
             self.context = self.browser.new_context(storage_state=state_path)
         else:
             self.context = self.browser.new_context()
-
         self.page = self.context.new_page()
-        self.page.on("dialog", lambda dlg: dlg.dismiss())
-        self.page.route("**/*.{png,svg}", lambda route: route.abort())
-
-    def goto(self, url: str, *, timeout: int = 5_000, wait_until: str = "load"):
-
-        try:
-            return self.page.goto(url, timeout=timeout, wait_until=wait_until)
-        except PlaywrightTimeout:
-            # fallback to load event if even DOMContentLoaded hung
-            return self.page.goto(url, timeout=timeout, wait_until="load")
-        
+        self._prepare_page(self.page)
+        self._track(self.page)
+        self._lookup = None
+
+    def _prepare_page(self, page):
+        page.on("dialog", lambda dlg: dlg.dismiss())
+        page.add_init_script(script=OVERLAY_OBSERVER_JS)
+        page.on("response", self.policy.record_response)
+        page.route("**/*", self.policy.handle)
+
+    def lookup_tab(self):
+        """
+        Second tab in the same context for customer/WO lookups, so the
+        task page on self.page never has to be reloaded.
+        """
+        if self._lookup is None or self._lookup.page.is_closed():
+            page = self.context.new_page()
+            self._prepare_page(page)
+            attach_network_listeners(page)
+            self._lookup = PageDriver(page)
+        return self._lookup
 
     def save_state(self):
         self.context.storage_state(path=STATE_PATH)
 
-    def __getattr__(self, name):
-        return getattr(self.page, name)
-
     def close(self):
         self.context.close()
         # only close the browser/playwright if *we* started it
@@ -132,10 +521,38 @@ class PlaywrightDriver:
         except Exception:
             pass
 
+class LazyDriver:
+    """
+    Stands in for a PlaywrightDriver that is only launched the first time
+    something uses it, so HTTP-read runs whose writes all go over HTTP
+    never start a browser. Attributes are forwarded once it is running.
+    """
+    def __init__(self, headless: bool = True, policy: RequestPolicy = None):
+        self._driver = None
+        self.headless = headless
+        self.policy = policy or RequestPolicy()
+
+    @property
+    def started(self):
+        return self._driver is not None
+
+    def __getattr__(self, name):
+        if self._driver is None:
+            log_message("🌐 Starting browser for the UI fallback")
+            self._driver = PlaywrightDriver(headless=self.headless, policy=self.policy)
+            attach_network_listeners(self._driver.page)
+        return getattr(self._driver, name)
+
+    def close(self):
+        if self._driver is not None:
+            self._driver.close()
+            self._driver = None
+
 def timed_goto(driver, url, **kwargs):
     start = perf_counter()
     driver.goto(url, **kwargs)
     elapsed = perf_counter() - start
+    throttle.record_latency(elapsed, url)
     log_message(f"🕒 Navigated to {url!r} in {elapsed:.2f}s")
 
 # === Login & Session ===
@@ -183,32 +600,67 @@ def handle_login(driver):
     driver.save_state()
     log_message("✅ Logged in via credentials")
 
+# “Close This” popups; watched for on every page by OVERLAY_OBSERVER_JS
+OVERLAY_SELECTORS = [
+    # the specific “Close This” button you showed
+    'input#valueForm1[type="button"]',
+    # any button with the value text “Close This”
+    'input[type="button"][value="Close This"]',
+]
+# legacy forms; only swept once after login
+LEGACY_OVERLAY_SELECTORS = [
+    'form[id^="valueForm"] input[type="button"]',
+    'form#f input[type="button"]',
+]
+
+# Clicks each visible match once; returns how many were clicked.
+OVERLAY_SWEEP_JS = """
+(selectors) => {
+    const seen = window.__overlaysClicked = window.__overlaysClicked || new WeakSet();
+    let clicked = 0;
+    for (const btn of document.querySelectorAll(selectors.join(","))) {
+        if (seen.has(btn) || btn.offsetParent === null) continue;
+        seen.add(btn);
+        btn.click();
+        clicked++;
+    }
+    return clicked;
+}
+"""
+
+# Init script: re-runs the sweep whenever the DOM changes, so popups are
+# dismissed as they appear and an idle page costs no round trips at all.
+OVERLAY_OBSERVER_JS = f"""
+(() => {{
+    const sweep = () => ({OVERLAY_SWEEP_JS})({json.dumps(OVERLAY_SELECTORS)});
+    const start = () => {{
+        sweep();
+        new MutationObserver(sweep).observe(
+            document.documentElement, {{childList: true, subtree: true}}
+        );
+    }};
+    if (document.readyState === "loading") {{
+        document.addEventListener("DOMContentLoaded", start);
+    }} else {{
+        start();
+    }}
+}})();
+"""
+
 def clear_first_time_overlays(page):
     """
-    Dismiss any first-time popups by clicking through known
-    “Close” or “OK” buttons until they’re gone.
-    """
-    # a list of selectors for the various popups you might hit
-    selectors = [
-        # the specific “Close This” button you showed
-        'xpath=//input[@id="valueForm1" and @type="button"]',
-        # any button with the value text “Close This”
-        'xpath=//input[@value="Close This" and @type="button"]',
-        # legacy forms
-        'xpath=//form[starts-with(@id,"valueForm")]//input[@type="button"]',
-        'xpath=//form[@id="f"]//input[@type="button"]'
-    ]
-
-    for sel in selectors:
-        # keep clicking until no more of that selector appear
-        while True:
-            try:
-                btn = page.wait_for_selector(sel, timeout=500)
-                btn.click()
-                # give the UI a moment to re-render
-                page.wait_for_timeout(200)
-            except PlaywrightTimeout:
-                break
+    Dismiss any first-time popups that are already on the page in a single
+    round trip. Popups that show up later are handled by the
+    OVERLAY_OBSERVER_JS init script every driver page carries.
+    """
+    try:
+        clicked = page.evaluate(OVERLAY_SWEEP_JS,
+                                OVERLAY_SELECTORS + LEGACY_OVERLAY_SELECTORS)
+    except PlaywrightError as e:
+        log_message(f"⚠️ Overlay sweep failed: {e}")
+        return
+    if clicked:
+        log_message(f"🧹 Dismissed {clicked} overlay(s)")
 
 def install_chromium(log=print):
     log("=== install_chromium started ===")
@@ -266,40 +718,96 @@ def install_chromium(log=print):
         raise
     log("=== install_chromium finished ===")
 
+def _playwright_version():
+    try:
+        return metadata.version("playwright")
+    except metadata.PackageNotFoundError:
+        # frozen bundles may not ship dist-info
+        try:
+            from playwright._repo_version import version
+            return version
+        except ImportError:
+            return None
+
+def write_chromium_manifest(executable_path, browser_version):
+    manifest = {
+        "executable": executable_path,
+        "browser_version": browser_version,
+        "playwright_version": _playwright_version(),
+        "mtime": os.path.getmtime(executable_path),
+    }
+    with open(CHROMIUM_MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
 def is_chromium_installed():
     """
-    Try launching Chromium headless via sync API. Returns True if successful.
+    Cheap check: True when the manifest written after the last successful
+    launch still matches the executable in BROWSERS and the installed
+    Playwright version. No browser is started.
     """
     try:
-        with sync_playwright() as pw:
-            browser = pw.chromium.launch(headless=True)
-            browser.close()
-        return True
-    except PlaywrightError:
+        with open(CHROMIUM_MANIFEST, encoding="utf-8") as f:
+            manifest = json.load(f)
+        exe = manifest["executable"]
+        return (
+            manifest["playwright_version"] == _playwright_version()
+            and Path(exe).resolve().is_relative_to(Path(BROWSERS).resolve())
+            and os.path.getmtime(exe) == manifest["mtime"]
+        )
+    except (OSError, ValueError, KeyError, TypeError):
         return False
+
+def probe_chromium():
+    """
+    Launch headless Chromium for real. On success refresh the manifest and
+    return (playwright, browser) so the caller can keep using them;
+    return None if it cannot be launched.
+    """
+    pw = None
+    try:
+        pw = sync_playwright().start()
+        browser = pw.chromium.launch(headless=True)
     except Exception:
-        return False
+        if pw:
+            pw.stop()
+        return None
+    try:
+        write_chromium_manifest(pw.chromium.executable_path, browser.version)
+    except OSError:
+        pass
+    return pw, browser
 
 def ensure_playwright(log=print):
     """
     Sync check: if Chromium not installed or broken, run install_chromium().
+    Returns (playwright, browser) when a real launch was needed so the
+    main run can reuse it, or None when the manifest vouched for the
+    install and nothing was started.
     """
     try:
-        if not is_chromium_installed():
-            # Inform user
-            try:
-                root = Tk()
-                root.withdraw()
-                messagebox.showinfo("Playwright", "Chromium not found; downloading browser binaries now. This may take a few minutes.")
-                root.destroy()
-            except Exception:
-                print("Chromium not found; downloading browser binaries now...")
-
-            install_chromium()
-
-            # After install, re-check
-            if not is_chromium_installed():
-                raise RuntimeError("Install completed but Chromium still not launchable.")
+        if is_chromium_installed():
+            return None
+
+        launched = probe_chromium()
+        if launched:
+            return launched
+
+        # Inform user
+        try:
+            root = Tk()
+            root.withdraw()
+            messagebox.showinfo("Playwright", "Chromium not found; downloading browser binaries now. This may take a few minutes.")
+            root.destroy()
+        except Exception:
+            print("Chromium not found; downloading browser binaries now...")
+
+        install_chromium()
+
+        # After install, re-check
+        launched = probe_chromium()
+        if not launched:
+            raise RuntimeError("Install completed but Chromium still not launchable.")
+        return launched
     except Exception as e:
         # Log and show error to user, referencing the log file
         err_msg = f"Playwright setup failed: {e}\nSee log file for details"
@@ -323,37 +831,13 @@ def log_message(msg, also_print=False):
     if also_print:
         print(full_msg)
 
-def format_dispatch_summary(driver):
-    ci = get_customer_and_ticket_info_from_task(driver)
-    if not ci or not ci["ticket"]:
-        return None
-
-    timed_goto(driver, ci["customer_url"], wait_until="load")
-    wo_url, wo_number = get_dispatch_work_order_url(driver, ci["ticket"])
-    if not wo_url:
-        return None
-
-    timed_goto(driver, wo_url)
-    # wait for the form to load
-    driver.wait_for_selector("#AdditionalNotes", state="attached", timeout=10_000)
-
-    el = driver.locator("xpath=//td[@class='detailHeader' and normalize-space(text())='Status:']"
-        "/following-sibling::td//span"
-    ).first
-    status = el.inner_text().strip().lower()
-    log_message(f"WO {wo_number} status → {status!r}")
-
-    # accept both "complete" and "completed"
-    if status not in ("complete", "completed"):
-        log_message(f"⚠️ WO {wo_number} is still uncompleted; skipping")
-        return
-
-
-    # pull raw strings
-    arr_date = driver.page.locator("#ArrivalOnsite").input_value().strip()
-    arr_time = driver.page.locator("#ArrivalTime").input_value().strip()
-    dep_date = driver.page.locator("#CompletedDate").input_value().strip()
-    dep_time = driver.page.locator("#CompletedTime").input_value().strip()
+def build_dispatch_summary(ci, wo_number, wo_url, wo):
+    """
+    Render the dispatch summary text from already-scraped values.
+    `wo` is a WorkOrder snapshot from read_work_order_snapshot().
+    """
+    arr_date, arr_time = wo.arr_date, wo.arr_time
+    dep_date, dep_time = wo.dep_date, wo.dep_time
 
     # display values (blank → “not given”)
     if arr_date and re.match(r"\d{4}-\d{2}-\d{2}", arr_date) and arr_time and re.match(r"\d{1,2}:\d{2}", arr_time):
@@ -378,17 +862,16 @@ def format_dispatch_summary(driver):
     else:
         total_display = "1.00"
 
-    notes = extract_work_order_notes(driver)
     # WORK DONE — prefer the “AdditionalNotes” field if present
-    work_done = notes["fields"].get("AdditionalNotes", notes["combined"]).strip()
+    work_done = wo.fields.get("AdditionalNotes", wo.combined).strip()
 
     # EQUIPMENT USED — from the EquipmentInstalled textarea, split lines
-    equipment_raw = notes["fields"].get("EquipmentInstalled", "")
+    equipment_raw = wo.fields.get("EquipmentInstalled", "")
     equipment = [line.strip() for line in equipment_raw.splitlines() if line.strip()]
 
     # RESPONSIBLE PARTY — look for “damage caused by X” or “X responsible,” else default
     responsible = "Customer"
-    text = notes["combined"].lower() 
+    text = wo.combined.lower() 
     # look for “damage caused by ...”
     m = re.search(r"damage caused by\s+([^.,\n]+)", text, re.IGNORECASE)
     if m:
@@ -403,8 +886,8 @@ def format_dispatch_summary(driver):
             responsible = "Brightspeed"
 
     summary = [
-        f"CUSTOMER: {ci['customer_name']}",
-        f"CID: {ci['cid']}",
+        f"CUSTOMER: {ci.customer_name}",
+        f"CID: {ci.cid}",
         f"WORK ORDER NUMBER: {wo_number}",
         f"WORK ORDER LINK: {wo_url}",
         "",
@@ -421,33 +904,244 @@ def format_dispatch_summary(driver):
         "",
         f"RESPONSIBLE PARTY: {responsible}"
     ]
-    summary_text = "\n".join(summary)
+    return "\n".join(summary)
+
+def format_dispatch_summary(driver, ci=None, store=None, customers=None, wo_cache=None):
+    """
+    Visit the customer and work-order pages on `driver` and build the
+    summary. Pass `ci` when the task page was already read elsewhere, so
+    `driver` can be a separate lookup tab. A customer already in the
+    `customers` cache, a completed WO in the persistent `wo_cache`, or
+    pages already in the prefetch `store` are used instead of being
+    navigated to.
+    """
+    if ci is None:
+        ci = get_customer_and_ticket_info_from_task(driver)
+    if not ci or not ci.ticket:
+        return None
+
+    rows = customers.get(ci.cid) if customers else None
+    if rows is None:
+        cached = store.lookup(ci.customer_url) if store else None
+        if cached:
+            rows = parse_work_order_rows_html(cached[0])
+        else:
+            timed_goto(driver, ci.customer_url, wait_until="load")
+            rows = read_work_order_rows(driver, ci.ticket)
+        if customers:
+            customers.put(ci.cid, rows)
+
+    wo_url, wo_number = pick_dispatch_work_order(rows or [], ci.ticket)
+    if not wo_url:
+        log_message(f"⚠️ No dispatch WOs found for Ticket #{ci.ticket}")
+        return None
+
+    wo = wo_cache.get(wo_number) if wo_cache else None
+    if wo is None:
+        cached = store.lookup(wo_url) if store else None
+        if cached:
+            wo = make_work_order_snapshot(parse_work_order_html(cached[0]))
+        else:
+            timed_goto(driver, wo_url)
+            wo = read_work_order_snapshot(driver)
+        if wo_cache:
+            wo_cache.put(wo_number, wo)
+    log_message(f"WO {wo_number} status → {wo.status!r}")
+
+    # accept both "complete" and "completed"
+    if wo.status not in ("complete", "completed"):
+        log_message(f"⚠️ WO {wo_number} is still uncompleted; skipping")
+        return
+
+    summary_text = build_dispatch_summary(ci, wo_number, wo_url, wo)
     log_message(summary_text)
     return summary_text
 
-def is_free_job(job_type):
-    if not job_type:
-        return ("(blank)", True, 100)
-
-    job_type_norm = normalize_string(job_type)
-    candidates = JOB_TYPE_CATEGORIES["Free"]
+FUZZY_CUTOFF = 90
+CDIST_PARALLEL_ROWS = 32    # below this, starting cdist's worker threads costs more than it saves
 
-    match, score, _ = process.extractOne(job_type_norm, candidates, scorer=fuzz.partial_ratio)
+def _best_match(candidates, row):
+    # (candidate, score) with the highest score; first one wins ties
+    if not candidates:
+        return None, 0
+    i = int(np.argmax(row))
+    return (candidates[i], float(row[i])) if row[i] else (None, 0)
 
-    log_message(f"🔍 Matching '{job_type}' → '{match}' (score: {score})")
-    return (match, score > 90, score)
+def classify_job_types(job_types, score_cutoff=FUZZY_CUTOFF):
+    """
+    Classify a batch of job types against JOB_TYPE_CATEGORIES with a single
+    process.cdist call: every distinct normalized job type is scored
+    against the Free and Billable candidates together, on all cores once
+    the batch is big enough to be worth splitting.
+
+    Returns {job_type: {"mode", "match", "score", "free", "billable"}},
+    where free/billable are each category's best (match, score). A score
+    must beat `score_cutoff` to count (lower ones come back as (None, 0)),
+    and Free wins over Billable; blank job types are Free.
+    """
+    free = list(JOB_TYPE_CATEGORIES["Free"])
+    billable = list(JOB_TYPE_CATEGORIES["Billable"])
+    results = {}
+    queries = defaultdict(list)     # normalized → job types
+    for job_type in dict.fromkeys(job_types):
+        if not job_type:
+            results[job_type] = {"mode": "Free", "match": "(blank)", "score": 100,
+                                 "free": ("(blank)", 100), "billable": (None, 0)}
+        else:
+            queries[normalize_string(job_type)].append(job_type)
+    if not queries:
+        return results
+
+    names = list(queries)
+    if free or billable:
+        scores = process.cdist(names, free + billable, scorer=fuzz.partial_ratio,
+                               score_cutoff=score_cutoff, dtype=np.float64,
+                               workers=-1 if len(names) >= CDIST_PARALLEL_ROWS else 1)
+    else:
+        scores = np.zeros((len(names), 0))
+
+    for name, row in zip(names, scores):
+        best_free = _best_match(free, row[:len(free)])
+        best_bill = _best_match(billable, row[len(free):])
+        if best_free[1] > score_cutoff:
+            mode, (match, score) = "Free", best_free
+        elif best_bill[1] > score_cutoff:
+            mode, (match, score) = "Billable", best_bill
+        else:
+            mode, (match, score) = "Unknown", max(best_free, best_bill, key=lambda m: m[1])
+        for job_type in queries[name]:
+            results[job_type] = {"mode": mode, "match": match, "score": score,
+                                 "free": best_free, "billable": best_bill}
+            log_message(f"🔍 Matching '{job_type}' → {mode} ('{match}', score: {score})")
+    return results
+
+def category_table_hash():
+    """Fingerprint of JOB_TYPE_CATEGORIES and the cutoff results depend on."""
+    table = {name: sorted(values) for name, values in JOB_TYPE_CATEGORIES.items()}
+    blob = json.dumps([table, FUZZY_CUTOFF], sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+class ClassificationMemo:
+    """
+    Persistent memo of classify_job_types() results, keyed by the
+    normalized job type and category_table_hash(): once the category table
+    changes, old rows no longer match and are dropped when the memo is
+    next opened. Holds at most `max_entries`, least recently used out first.
+    """
+    CHUNK = 500     # stay under SQLite's bound-parameter limit
+
+    def __init__(self, path: str = CLASSIFY_CACHE_PATH, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.table_hash = category_table_hash()
+        self.hits = self.misses = 0
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS classifications ("
+                " normalized TEXT NOT NULL,"
+                " table_hash TEXT NOT NULL,"
+                " result     TEXT NOT NULL,"
+                " last_used  REAL NOT NULL,"
+                " PRIMARY KEY (normalized, table_hash))"
+            )
+            self.conn.execute("DELETE FROM classifications WHERE table_hash != ?",
+                              (self.table_hash,))
+
+    def get_many(self, names):
+        """{normalized: result} for the names already classified."""
+        names = list(dict.fromkeys(names))
+        found = {}
+        for i in range(0, len(names), self.CHUNK):
+            chunk = names[i:i + self.CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT normalized, result FROM classifications"
+                f" WHERE table_hash = ? AND normalized IN ({marks})",
+                (self.table_hash, *chunk),
+            ).fetchall()
+            for name, blob in rows:
+                result = json.loads(blob)
+                result["free"] = tuple(result["free"])
+                result["billable"] = tuple(result["billable"])
+                found[name] = result
+        if found:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE classifications SET last_used = ?"
+                    " WHERE normalized = ? AND table_hash = ?",
+                    [(time.time(), name, self.table_hash) for name in found],
+                )
+        self.hits += len(found)
+        self.misses += len(names) - len(found)
+        return found
 
-def is_billable_job(job_type):
-    if not job_type:
-        return ("(blank)", False, 0)
+    def put_many(self, results):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, ?)",
+                [(name, self.table_hash, json.dumps(result), now)
+                 for name, result in results.items()],
+            )
+            self.conn.execute(
+                "DELETE FROM classifications WHERE rowid NOT IN ("
+                " SELECT rowid FROM classifications ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
 
-    job_type_norm = normalize_string(job_type)
-    candidates = JOB_TYPE_CATEGORIES["Billable"]
+    def close(self):
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0
+        log_message(f"🗂️ Classification memo: {self.hits} hit(s), {self.misses} miss(es) "
+                    f"({rate:.0f}% hit rate)", True)
+        self.conn.close()
 
-    match, score, _ = process.extractOne(job_type_norm, candidates, scorer=fuzz.partial_ratio)
+class JobTypeClassifier:
+    """
+    Per-run front end to classify_job_types(): each distinct job type is
+    classified once, and prime() classifies a whole batch in one call.
+    With a ClassificationMemo, job types seen in earlier runs are not
+    fuzzy-matched again.
+    """
+    def __init__(self, memo: ClassificationMemo = None):
+        self.known = {}
+        self.memo = memo
+        self.generation = RULES_GENERATION
+
+    def prime(self, job_types):
+        if self.generation != RULES_GENERATION:
+            # rules were reloaded: earlier answers may no longer hold
+            self.generation = RULES_GENERATION
+            self.known.clear()
+            if self.memo:
+                self.memo.table_hash = category_table_hash()
+        missing = [jt for jt in dict.fromkeys(job_types) if jt not in self.known]
+        if missing and self.memo:
+            names = {jt: normalize_string(jt) for jt in missing if jt}
+            cached = self.memo.get_many(names.values())
+            for jt, name in names.items():
+                if name in cached:
+                    self.known[jt] = cached[name]
+            missing = [jt for jt in missing if jt not in self.known]
+        if not missing:
+            return
+        fresh = classify_job_types(missing)
+        self.known.update(fresh)
+        if self.memo:
+            self.memo.put_many({normalize_string(jt): result
+                                for jt, result in fresh.items() if jt})
+
+    def classify(self, job_type):
+        self.prime([job_type])
+        return self.known[job_type]
+
+    def is_free(self, job_type):
+        return self.classify(job_type)["mode"] == "Free"
 
-    log_message(f"💰 Matching '{job_type}' → '{match}' (score: {score})")
-    return (match, score > 90, score)
+    def close(self):
+        if self.memo:
+            self.memo.close()
 
 def update_notes_only(frame, task_id, summary_text, log=log_message):
     try:
@@ -472,8 +1166,8 @@ def update_notes_only(frame, task_id, summary_text, log=log_message):
 
 def finalize_task(page: Page, task_id: int, summary_text: str, is_free: bool) -> bool:
     try:
-        # Always use the MainView iframe context
-        frame = page.frame(name="MainView")
+        # MainView iframe context, or the page itself when loaded directly
+        frame = page.frame(name="MainView") if is_menu_shell(page.url) else page.main_frame
         if not frame:
             raise Exception("MainView iframe not found!")
 
@@ -516,6 +1210,146 @@ def finalize_task(page: Page, task_id: int, summary_text: str, is_free: bool) ->
         log_message(f"❌ Error in finalize_task for task {task_id}: {e}")
         return False
 
+class AdaptiveLimiter:
+    """
+    AIMD limit on in-flight tasks, fed by the network listeners and by
+    navigation timings. Timings are kept per page kind (path + tabid), as
+    task, customer and WO pages load at very different speeds. Every
+    `window` timings of a kind, their p95 is compared with that kind's
+    baseline, an EWMA of its past p95s that rises more slowly than it
+    falls. A healthy window adds one slot; `patience` windows in a row
+    slower than `slowdown` x baseline halve the limit. A 429/503 halves it
+    right away, at most once per `window` timings so a burst of them
+    counts once.
+    Used as `async with throttle:` in the async engine, and only listens
+    between reset() and stop(), so sequential and HTTP runs (which share
+    the listeners) leave it alone.
+    """
+    BACKOFF_STATUSES = (429, 503)
+
+    def __init__(self, limit=4, max_limit=16, min_limit=1, window=40,
+                 slowdown=1.5, patience=3, decrease=0.5, smoothing=0.4):
+        self.lock = threading.Lock()
+        self.min_limit = min_limit
+        self.window = window
+        self.slowdown = slowdown
+        self.patience = patience
+        self.decrease = decrease
+        self.smoothing = smoothing
+        self._waiters = []
+        self.reset(limit, max_limit)
+        self.active = False
+
+    def reset(self, limit, max_limit):
+        """Start limiting from `limit` slots; the engine calls stop() when done."""
+        with self.lock:
+            self.active = True
+            self.max_limit = max(limit, max_limit)
+            self.limit = float(max(self.min_limit, limit))
+            self.in_flight = 0
+            self.samples = defaultdict(list)    # page kind → timings
+            self.baseline = {}                  # page kind → EWMA of p95
+            self.slow_windows = Counter()       # page kind → bad windows in a row
+            self.cooldown = 0
+            self.low = self.high = int(self.limit)
+
+    def stop(self):
+        with self.lock:
+            self.active = False
+
+    def record_status(self, status):
+        if not self.active or status not in self.BACKOFF_STATUSES:
+            return
+        with self.lock:
+            if self.cooldown:
+                return
+            self.cooldown = self.window
+            changed = self._set(self.limit * self.decrease, f"HTTP {status}")
+        if changed:
+            self._wake()
+
+    @staticmethod
+    def page_kind(url):
+        parts = urlsplit(url or "")
+        return parts.path, dict(parse_qsl(parts.query)).get("tabid", "")
+
+    def record_latency(self, seconds, url=""):
+        if not self.active:
+            return
+        kind = self.page_kind(url)
+        with self.lock:
+            self.cooldown = max(0, self.cooldown - 1)
+            samples = self.samples[kind]
+            samples.append(seconds)
+            if len(samples) < self.window:
+                return
+            ordered = sorted(samples)
+            samples.clear()
+            # nearest-rank percentile
+            p95 = ordered[math.ceil(0.95 * len(ordered)) - 1]
+            baseline = self.baseline.get(kind, p95)
+            # quick to follow improvements, slow to accept slowdowns: a load
+            # induced rise still trips the check, a lasting one stops counting
+            rate = self.smoothing if p95 < baseline else self.smoothing / 4
+            self.baseline[kind] = baseline + rate * (p95 - baseline)
+
+            changed = False
+            if p95 > baseline * self.slowdown:
+                self.slow_windows[kind] += 1
+                if self.slow_windows[kind] >= self.patience:
+                    self.slow_windows[kind] = 0
+                    changed = self._set(self.limit * self.decrease,
+                                        f"{kind[0]} p95 {p95:.2f}s vs {baseline:.2f}s")
+            else:
+                self.slow_windows[kind] = 0
+                changed = self._set(self.limit + 1, f"{kind[0]} p95 {p95:.2f}s")
+        if changed:
+            self._wake()
+
+    def _set(self, value, reason):
+        # caller holds self.lock
+        old = int(self.limit)
+        self.limit = min(self.max_limit, max(self.min_limit, value))
+        new = int(self.limit)
+        if new == old:
+            return False
+        self.low, self.high = min(self.low, new), max(self.high, new)
+        log_message(f"🎚️ Concurrency {old} → {new} ({reason})")
+        return True
+
+    def _wake(self):
+        with self.lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_resolve_waiter, fut)
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.lock:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return self
+                fut = loop.create_future()
+                self._waiters.append((loop, fut))
+            await fut
+
+    async def __aexit__(self, *exc):
+        with self.lock:
+            self.in_flight -= 1
+        self._wake()
+
+    def report(self):
+        log_message(f"🎚️ Concurrency ended at {int(self.limit)} "
+                    f"(range {self.low}–{self.high})", True)
+
+def _resolve_waiter(fut):
+    if not fut.done():
+        fut.set_result(None)
+
+# one per process; shard workers each get their own
+throttle = AdaptiveLimiter()
+
 def attach_network_listeners(page):
     page.on("response", lambda response: _log_response(response))
     page.on("requestfailed", lambda request: _log_failure(request))
@@ -523,6 +1357,7 @@ def attach_network_listeners(page):
 def _log_response(response):
     status = response.status
     url    = response.url
+    throttle.record_status(status)
     if status == 429:
         log_message(f"🚫 RATE LIMIT hit on {url} (429 Too Many Requests)")
     elif status >= 400:
@@ -554,268 +1389,507 @@ def parse_task_row(row):
         assigned = tds.nth(4).inner_text().strip()
         company  = tds.nth(5).inner_text().strip()
 
-        return {
-            "url":      url,
-            "desc":     desc,
-            "assigned": assigned,
-            "company":  company,
-        }
+        return TaskRow(url=url, desc=desc, due="", assigned=assigned, company=company)
     except Exception:
         return None
 
 def get_customer_and_ticket_info_from_task(driver):
     # ── enter MainView frame if present ────────────────────────────
     try:
-        driver.wait_for_selector("iframe#MainView", timeout=5_000)
-        frame = driver.frame(name="MainView")
+        frame = driver.main_view(timeout=5_000)
     except:
         log_message("⚠️ Already in MainView or frame not needed.")
-        frame = driver.main_frame()
+        frame = driver.main_frame
 
-    # ── extract Customer ID & Name ───────────────────────────────────
-    try:
-        cid = frame.locator(
-            "xpath=//td[normalize-space(text())='Customer ID']"
-            "/following-sibling::td/b"
-        ).inner_text().strip()
-        customer_name = frame.locator(
-            "xpath=//td[normalize-space(text())='Customer Name']"
-            "/following-sibling::td/b"
-        ).inner_text().strip()
-    except Exception as e:
-        log_message(f"❌ Failed to extract Customer ID/Name: {e}")
+    # ── extract Customer ID, Name & Ticket # ─────────────────────────
+    ci = parse_task_page_html(frame.content()).ci
+    if not ci:
+        log_message("❌ Failed to extract Customer ID/Name")
         return None
-
-    # ── extract Ticket # ─────────────────────────────────────────────
-    ticket_number = None
-    # 1) primary: look for “Dispatch for Ticket 12345”
-    try:
-        dispatch_handle = frame.locator("b", has_text="Dispatch for Ticket")
-        dispatch_handle.wait_for(timeout=10_000)
-        dispatch_text = dispatch_handle.inner_text().strip()
-        ticket_id    = dispatch_text.split()[-1]
-    except Exception:
+    if not ci.ticket:
         log_message("⚠️ Could not find Ticket # in page or URL")
+    return ci
 
-    customer_url = (
-        "http://inside.sockettelecom.com/menu.php"
-        f"?coid=1&tabid=7&parentid=9&customerid={cid}"
-    )
-    return {
-        "customer_name": customer_name,
-        "cid":            cid,
-        "ticket":         ticket_id,
-        "customer_url":   customer_url
-    }
+def get_dispatch_work_order_url(driver, ticket_number, log=log_message):
+    wo_rows = read_work_order_rows(driver, ticket_number, log)
+    if wo_rows is None:
+        return None, None
+
+    wo_url, wo_number = pick_dispatch_work_order(wo_rows, ticket_number)
+    if not wo_url:
+        log(f"⚠️ No dispatch WOs found for Ticket #{ticket_number}")
+        debug_frame_html(driver)             # ← and debug here as well
+        return None, None
+    return wo_url, wo_number
 
-def get_dispatch_work_order_url(driver, ticket_number, log=None):
+def read_work_order_rows(driver, ticket_number, log=log_message):
+    """
+    Parsed Work Orders table of the customer page loaded on `driver`, or
+    None if it never showed up.
+    """
     # 2) Grab the right frame
     try:
-        iframe_el = driver.wait_for_selector('iframe[name="MainView"]', timeout=10_000)
-        frame = iframe_el.content_frame()
+        frame = driver.main_view()
     except PlaywrightTimeout:
-        debug_frame_html(driver.page)
-        frame = driver.main_frame()
+        debug_frame_html(driver)
+        frame = driver.main_frame
 
     # 3) Wait for the work orders table
     try:
         frame.wait_for_selector("#custWork #workShow table tr", timeout=10_000)
     except PlaywrightTimeout:
         log(f"⚠️ No Work Orders table found for ticket {ticket_number}")
-        debug_frame_html(driver.page)        # ← debug here
-        return None, None
+        debug_frame_html(driver)             # ← debug here
+        return None
 
-    # 4) Collect every row, skipping the header
-    rows = frame.locator("#custWork #workShow table tr")
-    count = rows.count()
-    if count == 0:
+    # 4) Read the whole table in one round trip
+    wo_rows = parse_work_order_rows_html(frame.content())
+    if not wo_rows:
         log(f"⚠️ Found zero rows in Work Orders for ticket {ticket_number}")
-        debug_frame_html(driver.page)        # ← and debug here too
-        return None, None
+        debug_frame_html(driver)             # ← and debug here too
+    return wo_rows
 
-    dispatch_wos = []
-    for i in range(count):
-        row = rows.nth(i)
-        tds = row.locator("td")
-        if tds.count() < 5:
-            continue
 
-        first = tds.nth(0).inner_text().strip()
-        # skip header row
-        if first == "#" or not first.isdigit():
-            continue
+class WorkOrderCache:
+    """
+    Persistent SQLite store of parsed work-order snapshots keyed by WO
+    number. Only complete/completed WOs are stored, since their times and
+    notes no longer change; entries expire after `ttl_days` and the least
+    recently used are evicted beyond `max_entries`.
+    """
+    def __init__(self, path: str = WO_CACHE_PATH, ttl_days: float = 30,
+                 max_entries: int = 5000):
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        # WAL lets shard workers read while another one writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS work_orders ("
+            " wo_number INTEGER PRIMARY KEY,"
+            " snapshot  TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get(self, wo_number):
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT snapshot FROM work_orders WHERE wo_number = ? AND stored_at >= ?",
+            (wo_number, now - self.ttl),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.conn.execute("UPDATE work_orders SET last_used = ? WHERE wo_number = ?",
+                          (now, wo_number))
+        self.conn.commit()
+        self.hits += 1
+        return WorkOrder(**json.loads(row[0]))
+
+    def put(self, wo_number, snapshot):
+        if snapshot.status not in ("complete", "completed"):
+            return
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO work_orders VALUES (?, ?, ?, ?)",
+                (wo_number, json.dumps(snapshot._asdict()), now, now),
+            )
+            self.conn.execute("DELETE FROM work_orders WHERE stored_at < ?",
+                              (now - self.ttl,))
+            self.conn.execute(
+                "DELETE FROM work_orders WHERE wo_number NOT IN ("
+                " SELECT wo_number FROM work_orders ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
 
-        wo_num = int(first)
-        desc   = tds.nth(1).inner_text().strip().lower()
-        link   = tds.nth(4).locator("a").get_attribute("href")
+    def close(self):
+        log_message(f"🗄️ WO cache: {self.hits} hit(s), {self.misses} miss(es)", True)
+        self.conn.close()
 
-        if re.search(rf"ticket\s*#?\s*{ticket_number}", desc, re.IGNORECASE):
-            dispatch_wos.append((wo_num, link))
 
-    if not dispatch_wos:
-        log(f"⚠️ No dispatch WOs found for Ticket #{ticket_number}")
-        debug_frame_html(driver.page)        # ← and debug here as well
-        return None, None
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one: the first caller
+    runs the function, callers arriving while it is in flight wait for and
+    share its result (or exception). Nothing is kept afterwards.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}        # key → Future
+        self.shared = 0
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            fut = self._calls.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if owner:
+            try:
+                fut.set_result(fn(*args))
+            except Exception as e:
+                fut.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        return fut.result()
 
-    # 5) Return the most-recent WO
-    wo_number, pwo_url = max(dispatch_wos, key=lambda x: x[0])
-    wo_url = urljoin("http://inside.sockettelecom.com/", pwo_url)
-    return wo_url, wo_number
+class CustomerCache:
+    """
+    Per-run parsed Work Orders tables keyed by CID, so every ticket lookup
+    after a customer's first is a dictionary hit instead of a page load.
+    """
+    def __init__(self):
+        self._rows = {}
+        self.hits = self.misses = 0
+
+    def get(self, cid):
+        rows = self._rows.get(cid)
+        if rows is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return rows
 
-def extract_work_order_notes(driver):
-    try:
-        driver.wait_for_selector("#AdditionalNotes", timeout=10_000)
+    def put(self, cid, rows):
+        if rows is not None:
+            self._rows[cid] = rows
 
-        fields = {
-            "EquipmentInstalled":  "",
-            "AdditionalMaterials": "",
-            "TestsPerformed":      "",
-            "AdditionalNotes":     ""
-        }
+    def report(self):
+        log_message(f"👥 Customer cache: {self.hits} hit(s), {self.misses} miss(es)", True)
 
-        for fid in fields:
-            try:
-                val = driver.locator(f"#{fid}").input_value().strip()
-                fields[fid] = val
-                if val:
-                    log_message(f"📄 {fid} → {len(val)} chars")
-            except Exception as e:
-                log_message(f"⚠️ Could not read {fid}: {e}")
+@lru_cache(maxsize=256)
+def _ticket_pattern(ticket_number):
+    return re.compile(rf"ticket\s*#?\s*{re.escape(ticket_number)}", re.IGNORECASE)
 
-        combined = "\n".join(
-            f"{label.replace('Additional','Additional ').replace('Performed','Performed:')}: {txt}"
-            for label, txt in fields.items() if txt
-        )
+def pick_dispatch_work_order(wo_rows, ticket_number):
+    """
+    Given (number, description, href) rows from the customer's Work
+    Orders table, return (absolute_url, wo_number) of the most recent WO
+    that mentions the ticket, or (None, None).
+    """
+    pattern = _ticket_pattern(str(ticket_number))
+
+    # skip header / non-numeric rows, then walk newest-first so the first
+    # hit is the answer (the table is usually already in that order)
+    numbered = [
+        (int(first.strip()), desc, link)
+        for first, desc, link in wo_rows
+        if first.strip().isdigit()
+    ]
+    numbered.sort(key=lambda x: x[0], reverse=True)
 
-        return {"fields": fields, "combined": combined.strip()}
+    for wo_number, desc, link in numbered:
+        if link and pattern.search(desc):
+            return urljoin("http://inside.sockettelecom.com/", link), wo_number
+    return None, None
+
+def combine_work_order_fields(fields):
+    combined = "\n".join(
+        f"{label.replace('Additional','Additional ').replace('Performed','Performed:')}: {txt}"
+        for label, txt in fields.items() if txt
+    )
+    return combined.strip()
+
+def make_work_order_snapshot(raw):
+    """
+    Normalise the WorkOrderFields from parse_work_order_html() into a
+    WorkOrder: status (lowercased), arr_date/arr_time/dep_date/dep_time,
+    the note `fields` and their `combined` text.
+    """
+    fields = {}
+    for fid in WORK_ORDER_NOTE_FIELDS:
+        val = raw.fields.get(fid)
+        if val is None:
+            log_message(f"⚠️ Could not read {fid}: element not found")
+            val = ""
+        fields[fid] = val.strip()
+        if fields[fid]:
+            log_message(f"📄 {fid} → {len(fields[fid])} chars")
+
+    return WorkOrder(
+        status=(raw.status or "").strip().lower(),
+        arr_date=(raw.arr_date or "").strip(),
+        arr_time=(raw.arr_time or "").strip(),
+        dep_date=(raw.dep_date or "").strip(),
+        dep_time=(raw.dep_time or "").strip(),
+        fields=fields,
+        combined=combine_work_order_fields(fields),
+    )
+
+def read_work_order_snapshot(driver):
+    # wait for the form once, then read it once
+    driver.wait_for_selector("#AdditionalNotes", state="attached", timeout=10_000)
+    return make_work_order_snapshot(parse_work_order_html(driver.page.content()))
+
+def extract_work_order_notes(driver, snapshot=None):
+    try:
+        wo = snapshot or read_work_order_snapshot(driver)
+        return {"fields": wo.fields, "combined": wo.combined}
 
     except Exception as e:
         log_message(f"❌ Failed to extract WO notes: {e}")
         return {"fields": {}, "combined": ""}
 
-def extract_due_consultation_tasks(driver):
-    page = driver.page
-
-    # 1) Navigate & wait
+def open_task_list(driver):
+    # 1) Navigate & grab the content frame
     log_message(f"\n🔎 Opening task URL: {TASK_URL}")
-    page.goto(TASK_URL)
-    page.wait_for_selector("iframe#MainView", timeout=10_000)
-
-    # 2) Grab the frame by name
-    frame = page.frame(name="MainView")
-    if frame is None:
-        frame = page.main_frame()
+    timed_goto(driver, TASK_URL)
+    frame = driver.main_view()
 
     log_message("Loading Tasks…", also_print=True)
-
     frame.wait_for_selector("//tr[contains(@class,'taskElement')]", timeout=30_000)
-    rows = frame.locator("//tr[contains(@class,'taskElement')]")
-    today = date.today()
-    due = []
+    return frame
 
+def read_task_rows(frame):
+    return parse_task_list_html(frame.content())
+
+def read_task_rows_by_locator(frame):
+    """
+    Per-row locator path (one round trip per cell). Kept as the
+    reference for benchmark_task_extraction().
+    """
+    rows = frame.locator("//tr[contains(@class,'taskElement')]")
+    out = []
     for i in range(rows.count()):
         row = rows.nth(i)
         task = parse_task_row(row)
-        if not task or "consultation" not in task["desc"].lower():
+        if not task:
+            continue
+        try:
+            task = task._replace(due=row.locator("td:nth-child(4) nobr").inner_text().strip())
+        except Exception:
+            pass
+        out.append(task)
+    return out
+
+def filter_due_consultation_tasks(rows, today=None):
+    today = today or date.today()
+    due = []
+
+    for task in rows:
+        if "consultation" not in task.desc.lower():
             continue
 
         try:
-            due_str = row.locator("td:nth-child(4) nobr").inner_text().strip()
-            due_dt  = datetime.strptime(due_str, "%Y-%m-%d").date()
+            due_dt = datetime.strptime(task.due, "%Y-%m-%d").date()
         except Exception:
-            log_message(f"⚠️ Couldn't parse due date '{due_str}'; skipping", also_print=True)
+            log_message(f"⚠️ Couldn't parse due date '{task.due}'; skipping", also_print=True)
             continue
 
         if due_dt > today:
-            log_message(f"⏳ Skipping '{task['desc']}' (due {due_dt.isoformat()})", also_print=True)
+            log_message(f"⏳ Skipping '{task.desc}' (due {due_dt.isoformat()})", also_print=True)
             continue
 
         due.append(task)
+    return due
 
+def extract_due_consultation_tasks(driver):
+    frame = open_task_list(driver)
+    due = filter_due_consultation_tasks(read_task_rows(frame))
     log_message(f"✅ Found {len(due)} due consultation tasks.", also_print=True)
     return due
 
+def benchmark_task_extraction(driver, rounds=3):
+    """
+    Time the content()+parser path against the per-row locator path on
+    the live task list and log both. The parser path is also split into
+    fetching the HTML and parsing it.
+    """
+    frame = open_task_list(driver)
+    timings = {"content": [], "parse": [], "locator": []}
+    for _ in range(rounds):
+        start = perf_counter()
+        html = frame.content()
+        timings["content"].append(perf_counter() - start)
+
+        start = perf_counter()
+        rows = parse_task_list_html(html)
+        timings["parse"].append(perf_counter() - start)
+
+        start = perf_counter()
+        read_task_rows_by_locator(frame)
+        timings["locator"].append(perf_counter() - start)
+
+    log_message(f"\n⏱️ Task list extraction ({len(rows)} rows, best of {rounds}):", True)
+    for name, times in timings.items():
+        log_message(f"  {name:<8} {min(times):.3f}s", True)
+    return timings
+
 def extract_task_id_from_page(driver):
     """
     Returns the current Task ID by reading the hidden nTaskID input
     inside the MainView frame, or None if not found.
     """
-    page = driver.page
-
-    # 1) Make sure the frame is there
+    # 1) Look for the hidden input by name in the tracked MainView frame
     try:
-        page.wait_for_selector("iframe#MainView", timeout=5_000)
-        frame = page.frame(name="MainView") or page.main_frame()
+        locator = driver.view_locator("[name=nTaskID]")
     except Exception:
         # no frame → fall back
-        frame = page.main_frame()
-
-    # 2) Look for the hidden input by name
-    locator = frame.locator("[name=nTaskID]")
+        locator = driver.page.main_frame.locator("[name=nTaskID]")
     if locator.count() == 0:
         return None
 
-    # 3) Return its value
+    # 2) Return its value
     try:
         task_id = locator.input_value().strip()
         return task_id or None
     except Exception:
         return None
 
-def parse_job_type_from_task(driver, url):
+JOB_TYPE_MATCHER = KeywordMatcher(DEFAULT_RULES["keyword_rules"])
+MAJOR_TYPES = list(DEFAULT_RULES["major_types"])
+MAJOR_TYPE_MATCHER = KeywordMatcher([(m, False, [m]) for m in MAJOR_TYPES])
+RULES_GENERATION = 0        # bumped on every install, so per-run memos can reset
+_rules_mtime = None
+
+def _string_list(value, where):
+    if not isinstance(value, list) or not all(isinstance(x, str) and x.strip() for x in value):
+        raise ValueError(f"{where} must be a list of non-empty strings")
+    return value
+
+def check_rules(rules):
+    """Raise ValueError unless `rules` has the shape DEFAULT_RULES has."""
+    if not isinstance(rules, dict):
+        raise ValueError("rules must be a JSON object")
+    if rules.get("version") != RULES_VERSION:
+        raise ValueError(f"unsupported rules version {rules.get('version')!r}")
+    categories = rules.get("categories")
+    if not isinstance(categories, dict):
+        raise ValueError("categories must be an object of name → job types")
+    for name, values in categories.items():
+        _string_list(values, f"categories[{name!r}]")
+    keyword_rules = rules.get("keyword_rules")
+    if not isinstance(keyword_rules, list):
+        raise ValueError("keyword_rules must be a list of [label, whole_word, keywords]")
+    for i, rule in enumerate(keyword_rules):
+        if not (isinstance(rule, list) and len(rule) == 3
+                and isinstance(rule[0], str) and rule[0].strip()
+                and isinstance(rule[1], bool)):
+            raise ValueError(f"keyword_rules[{i}] must be [label, whole_word, keywords]")
+        _string_list(rule[2], f"keyword_rules[{i}] keywords")
+    _string_list(rules.get("major_types"), "major_types")
+
+def install_rules(rules):
+    """
+    Compile a rules dict into the live category table and matchers.
+    Raises ValueError (leaving the live rules alone) if it is malformed.
+    """
+    global JOB_TYPE_CATEGORIES, JOB_TYPE_MATCHER, MAJOR_TYPES, MAJOR_TYPE_MATCHER
+    global RULES_GENERATION
+    check_rules(rules)
+    categories = {
+        name: {normalize_string(x) for x in values}
+        for name, values in rules["categories"].items()
+    }
+    for name in ("Free", "Billable", "Unknown"):
+        categories.setdefault(name, set())
+    matcher = KeywordMatcher(rules["keyword_rules"])
+    major_types = list(rules["major_types"])
+    # a job type counts under the first major type it contains
+    major_matcher = KeywordMatcher([(m, False, [m]) for m in major_types])
+
+    JOB_TYPE_CATEGORIES, JOB_TYPE_MATCHER = categories, matcher
+    MAJOR_TYPES, MAJOR_TYPE_MATCHER = major_types, major_matcher
+    RULES_GENERATION += 1
+
+def load_rules(path=RULES_PATH):
+    """
+    Install the job-type rules from `path`, writing DEFAULT_RULES there
+    first if the file doesn't exist. A file that can't be used is logged
+    and the rules already installed stay in place.
+    """
+    global _rules_mtime
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(DEFAULT_RULES, f, indent=2)
+    # remembered even on failure, so a broken file is retried only once changed
+    _rules_mtime = os.path.getmtime(path)
     try:
-        page = driver.page
+        with open(path, encoding="utf-8") as f:
+            install_rules(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        log_message(f"⚠️ Could not load job-type rules from {path}: {e}", True)
+        return False
+    log_message(f"📐 Loaded job-type rules from {path}")
+    return True
 
-        # 1) Navigate & wait
-        log_message(f"\n🔎 Opening task URL: {url}")
-        page.goto(url)
-        page.wait_for_selector("iframe#MainView", timeout=10_000)
+def refresh_rules(path=RULES_PATH):
+    """Reload the rules file if it changed since it was last read."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return False
+    if mtime == _rules_mtime:
+        return False
+    return load_rules(path)
+
+load_rules()
+
+# a <b>…</b> statement anywhere wins over a plain one earlier in the notes
+PROBLEM_STATEMENT_RE = re.compile(
+    r"PROBLEM STATEMENT(?:\s*\(Statement\))?:\s*(?:<b>(?P<bold>.*?)</b>|(?P<plain>.+))",
+    re.IGNORECASE,
+)
+
+def find_problem_statement(raw_notes):
+    """("bold" | "plain", text) of the problem statement to use, or None."""
+    plain, pos = None, 0
+    while True:
+        m = PROBLEM_STATEMENT_RE.search(raw_notes, pos)
+        if m is None:
+            return plain
+        if m.group("bold") is not None:
+            return "bold", m.group("bold")
+        if plain is None:
+            plain = ("plain", m.group("plain"))
+        # a plain match runs to the end of its line; look inside it too
+        pos = m.start() + 1
+
+def job_type_from_notes(raw_notes):
+    """
+    Pure job-type classifier for a task's Notes text; shared by the sync
+    and async pipelines.
+    """
+    raw_notes = (raw_notes or "").strip()
 
-        # 2) Grab the frame by name
-        frame = page.frame(name="MainView")
-        if frame is None:
-            frame = page.main_frame()
+    job_type = JOB_TYPE_MATCHER.first(raw_notes)
+    if job_type:
+        return job_type
+
+    statement = find_problem_statement(raw_notes)
+    if statement and statement[0] == "bold":
+        return statement[1].strip()
+    if statement:
+        log_message("⚠️ Found plain problem statement")
+        text = re.sub(r"</?[^>]+>", "", statement[1].strip())
+        return text[:100].strip()
+
+    for line in raw_notes.splitlines()[:15]:
+        if "ont" in line.lower() and 3 < len(line.strip()) < 100:
+            log_message("⚠️ Using fallback ONT line")
+            return line.strip()
+
+    log_message("❌ Could not identify job type — returning 'Unknown'")
+    log_message(f"WO Notes: {raw_notes}")
+    return "Unknown"
+
+def parse_job_type_from_task(driver, url):
+    try:
+        # 1) Navigate & grab the content frame
+        log_message(f"\n🔎 Opening task URL: {url}")
+        timed_goto(driver, url)
+        frame = driver.main_view()
 
         # …now use `frame` for everything below…
-        textarea = frame.wait_for_selector("[name=Notes]", timeout=10_000)
-        raw_notes = textarea.input_value().strip()
-        lower = raw_notes.lower()
-
-        if "courtesy dispatch" in lower or "no charge" in lower:
-            return "Consultation"
-
-        for patt in [r"\bphone check\b", r"\bjack\b", r"\bfxs\b",
-                     r"\bdial tone\b", r"\bno dial tone\b"]:
-            if re.search(patt, lower):
-                return "Phone Check"
-
-        if any(k in lower for k in ["go live", "activate", "turn up"]):
-            return "Go-Live"
-        if any(k in lower for k in ["speed test", "throughput", "latency"]):
-            return "Speed Test"
-        if any(k in lower for k in ["nid", "modem swap"]):
-            return "NID/IW/CopperTest"
-
-        match = re.search(r"PROBLEM STATEMENT(?:\s*\(Statement\))?:\s*<b>(.*?)</b>",
-                          raw_notes, re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-
-        match = re.search(r"PROBLEM STATEMENT(?:\s*\(Statement\))?:\s*(.+)",
-                          raw_notes, re.IGNORECASE)
-        if match:
-            log_message("⚠️ Found plain problem statement")
-            text = re.sub(r"</?[^>]+>", "", match.group(1).strip())
-            return text[:100].strip()
-
-        for line in raw_notes.splitlines()[:15]:
-            if "ont" in line.lower() and 3 < len(line.strip()) < 100:
-                log_message("⚠️ Using fallback ONT line")
-                return line.strip()
-
-        log_message("❌ Could not identify job type — returning 'Unknown'")
-        log_message(f"WO Notes: {raw_notes}")
-        return "Unknown"
+        frame.wait_for_selector("[name=Notes]", timeout=10_000)
+        return job_type_from_notes(parse_task_page_html(frame.content()).notes)
 
     except Exception as e:
         log_message(f"❌ Failed to parse job type from {url}: {e}")
@@ -921,7 +1995,7 @@ def notes_already_contain_summary(frame, task_id, summary_text, log=log_message)
 def expand_task(frame, task_id, log=log_message):
     """
     Expands the hidden task form inside MainView iframe.
-    `frame` should be driver.frame(name="MainView") or driver.main_frame().
+    `frame` should be driver.main_view().
     """
     span_sel   = f"#displaySpan{task_id}"
     # This locator jumps from the span to its legend in one shot:
@@ -949,38 +2023,45 @@ def handle_sigterm(signum, frame):
     print("Received SIGTERM, exiting gracefully.")
     sys.exit(0)
 
+SUMMARY_SAMPLE_IDS = 3
+
+def _summary_bucket(job_type, matcher):
+    # summary line a stripped job type counts under; None for Other
+    major = matcher.first(job_type)
+    if major:
+        return major
+    normalized = job_type.lower()
+    if normalized == "blank" or job_type == "":
+        return "Blank"
+    if normalized in ("unknown", "error"):
+        return "Unknown"
+    return None
+
 def summarize_job_types(results):
-    major_types = [
-        "ONT In Disco", "ONT Move", "ONT Swap", "WiFi Survey",
-        "Go-Live", "NID/IW/CopperTest", "IW Tie Down", "Onn Install", 
-        "Equipment Check/ONT Swap"
-    ]
+    """
+    Count results per major job type (the first of MAJOR_TYPES a job type
+    contains), Blank, Unknown and Other, and log the summary. Each distinct
+    job type is matched once; Other job types keep only a count and up to
+    SUMMARY_SAMPLE_IDS task IDs, so long histories stay cheap.
+    """
+    major_types, matcher = MAJOR_TYPES, MAJOR_TYPE_MATCHER
     job_counter = Counter()
-    other_types = defaultdict(list)
+    other_types = {}        # job type → {"count", "samples"}
+    buckets = {}
 
     for task in results:
         job_type = task["Job Type"].strip()
-        normalized = job_type.lower()
-
-        matched = False
-        for major in major_types:
-            if major.lower() in normalized:
-                job_counter[major] += 1
-                matched = True
-                break
-
-        if not matched:
-            if normalized == "blank":
-                job_counter["Blank"] += 1
-            elif normalized in ["unknown", "error"]:
-                job_counter["Unknown"] += 1
-            elif job_type == "":
-                job_counter["Blank"] += 1
-            else:
-                other_types[job_type].append(task)
-                job_counter["Other"] += 1
-
-
+        if job_type not in buckets:
+            buckets[job_type] = _summary_bucket(job_type, matcher)
+        bucket = buckets[job_type]
+        if bucket:
+            job_counter[bucket] += 1
+            continue
+        other = other_types.setdefault(job_type, {"count": 0, "samples": []})
+        other["count"] += 1
+        if len(other["samples"]) < SUMMARY_SAMPLE_IDS:
+            other["samples"].append(task.get("Task ID"))
+        job_counter["Other"] += 1
 
     # Print summary
     log_message("\n📊 Job Type Summary:", True)
@@ -994,86 +2075,920 @@ def summarize_job_types(results):
     if "Other" in job_counter:
         log_message(f"  Other: {job_counter['Other']} (see below)", True)
         for other in other_types:
-            log_message(f"    • {other} — {len(other_types[other])} task(s)", True)
+            log_message(f"    • {other} — {other_types[other]['count']} task(s)", True)
 
     return job_counter, other_types
 
 def has_existing_notes(frame, task_id):
-    # grab everything in the span *before* the <form> tag
-    html = frame.locator(f"#displaySpan{task_id}").inner_html()
-    before_form = html.split("<form", 1)[0]
-    # strip out any tags and whitespace
-    plain = re.sub(r"<[^>]+>", "", before_form).strip()
-    return bool(plain)
-
-def run_with_progress(driver, complete_free=False):
-    results, errors = [], []
-    due_tasks = extract_due_consultation_tasks(driver)
+    return span_has_notes(frame.locator(f"#displaySpan{task_id}").inner_html())
 
-    for task in tqdm(due_tasks, desc="Processing consultation tasks", unit="task"):
-        try:
-            # 1) parse job type
-            job_type = parse_job_type_from_task(driver, task["url"])
-            is_free = is_free_job(job_type)[1]
-            is_bill = is_billable_job(job_type)[1]
-            task_id = None
+def load_task_page(driver, url):
+    """
+    Single visit to a task page: navigates once, captures everything the
+    pipeline needs from it (notes, nTaskID, existing-notes state,
+    customer/ticket info) via parse_task_page_html(), and leaves the task
+    form expanded on driver.page for finalize_task().
+    """
+    log_message(f"\n🔎 Opening task URL: {url}")
+    timed_goto(driver, url)
+    frame = driver.main_view()
+
+    frame.wait_for_selector("[name=Notes]", timeout=10_000)
+    plan = parse_task_page_html(frame.content())
+    expand_task(frame, plan.task_id)
+    if plan.ci and not plan.ci.ticket:
+        log_message("⚠️ Could not find Ticket # in page or URL")
+    return plan
+
+def run_with_progress(driver, complete_free=False, use_cache=True):
+    due_tasks = extract_due_consultation_tasks(driver)
+    return process_tasks(driver, due_tasks, use_cache=use_cache)
+
+def open_task_for_write(driver, url, task_id):
+    """Load a task page in the browser only to write to its form."""
+    timed_goto(driver, url)
+    frame = driver.main_view()
+    expand_task(frame, task_id)
+    return frame
+
+def relogin(driver, reader):
+    """Log in again in the browser and hand the fresh cookies to `reader`."""
+    log_message("🔑 Saved session expired; logging in again", True)
+    handle_login(driver)
+    driver.save_state()
+    reader.load_cookies(STATE_PATH)
+    if reader.store:
+        reader.store.reader.load_cookies(STATE_PATH)
+
+def process_task(driver, task, reader, store, customers, wo_cache, classifier):
+    """One task through the pipeline; its results row, or None if skipped or failed."""
+    # 1) load the task page once and capture everything from it
+    if reader:
+        plan = reader.load_task_page(task.url)
+    else:
+        plan = load_task_page(driver, task.url)
+    job_type = job_type_from_notes(plan.notes)
+    is_free = classifier.is_free(job_type)
+    task_id = plan.task_id
+
+    # 2) skip if notes already exist
+    if plan.has_notes:
+        log_message(f"⏭️ Task {task_id} already has notes, skipping")
+        return None
 
-            # 2) open & expand
-            driver.goto(task["url"])
-            frame = driver.frame(name="MainView") or driver.main_frame()
-            expand_task(frame, task_id := extract_task_id_from_page(driver))
+    # 3) format summary in the lookup tab; the task form stays loaded
+    if reader:
+        summary_text = reader.dispatch_summary(plan.ci, customers, wo_cache)
+    else:
+        summary_text = format_dispatch_summary(driver.lookup_tab(), ci=plan.ci,
+                                               store=store, customers=customers,
+                                               wo_cache=wo_cache)
+    if not summary_text:
+        log_message(f"⚠️ No summary for Task {task_id}, skipping")
+        return None
 
-            # 3) skip if notes already exist
+    # 4) finalize in one shot (HTTP first when reading over HTTP)
+    success = reader and reader.submit_task_form(plan, summary_text, is_free)
+    if not success:
+        if reader:
+            frame = open_task_for_write(driver, task.url, task_id)
             if has_existing_notes(frame, task_id):
                 log_message(f"⏭️ Task {task_id} already has notes, skipping")
+                return None
+        success = finalize_task(driver.page, task_id, summary_text, is_free)
+    if not success:
+        log_message(f"⚠️ Failed to finalize Task {task_id}")
+        debug_frame_html(driver)
+        return None
+
+    mode = "Free" if is_free else "Billable"
+    log_message(f"✔️ Task {task_id} {mode} completed")
+    return {
+        "Company":     task.company,
+        "Description": task.desc,
+        "URL":         task.url,
+        "Job Type":    job_type,
+        "Task ID":     task_id,
+        "Mode":        mode
+    }
+
+def process_tasks(driver, due_tasks, desc="Processing consultation tasks", position=None,
+                  reader=None, prefetch=0, use_cache=True):
+    """
+    Run the per-task pipeline. With an HttpReader, all reads go over HTTP
+    and the browser is only used to write the task form; if the saved
+    session expires, the browser logs in once and the task is retried, and
+    a second expiry stops the run. With prefetch=K, the next K tasks'
+    pages are fetched in the background meanwhile.
+    use_cache=False bypasses the persistent WorkOrderCache and ClassificationMemo.
+    """
+    results, errors = [], []
+    customers = CustomerCache()
+    classifier = JobTypeClassifier(ClassificationMemo() if use_cache else None)
+    wo_cache = WorkOrderCache() if use_cache else None
+    store = None
+    if prefetch > 0:
+        store = PrefetchStore(reader or HttpReader(), lookahead=prefetch)
+        if reader:
+            reader.store = store
+    relogged = False
+
+    for idx, task in enumerate(tqdm(due_tasks, desc=desc, unit="task", position=position)):
+        refresh_rules()
+        if store:
+            store.schedule(due_tasks[idx + 1: idx + 1 + prefetch])
+            # one fuzzy-matching batch for every task page already fetched
+            classifier.prime([job_type_from_notes(notes)
+                              for notes in store.notes(due_tasks[idx: idx + 1 + prefetch])])
+        args = (driver, task, reader, store, customers, wo_cache, classifier)
+        try:
+            try:
+                row = process_task(*args)
+            except SessionExpired:
+                if relogged or not reader:
+                    raise
+                relogged = True
+                relogin(driver, reader)
+                row = process_task(*args)
+            if row:
+                results.append(row)
+
+        except SessionExpired as e:
+            # every task after this one would fail the same way
+            errors.append({"Task": task, "Error": str(e), "Traceback": traceback.format_exc()})
+            log_message(f"❌ {e}; stopping after {idx} of {len(due_tasks)} task(s)", True)
+            break
+        except Exception as e:
+            tb = traceback.format_exc()
+            errors.append({"Task": task, "Error": str(e), "Traceback": tb})
+            log_message(f"❌ Error for {task.desc} — {e}")
+            log_message(tb)
+        finally:
+            if store:
+                store.release(task.url)
+
+    if store:
+        store.close()
+    customers.report()
+    classifier.close()
+    if wo_cache:
+        wo_cache.close()
+
+    return results, errors
+
+# === HTTP Read Path ===
+BASE_URL = "http://inside.sockettelecom.com/"
+
+
+class SessionExpired(RuntimeError):
+    pass
+
+
+class HttpReader:
+    """
+    Browserless reads of the server-rendered pages. A pooled keep-alive
+    requests.Session carries the cookies saved in STATE_PATH, and menu.php
+    shells are resolved to their MainView content URL.
+    """
+    def __init__(self, state_path: str = STATE_PATH, pool_size: int = 8,
+                 timeout: int = PAGE_TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.load_cookies(state_path)
+        self.store = None
+        self._inflight = SingleFlight()
+
+    def load_cookies(self, state_path):
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        for c in state.get("cookies", []):
+            self.session.cookies.set(c["name"], c["value"],
+                                     domain=c.get("domain"), path=c.get("path", "/"))
+
+    def get(self, url):
+        """(html, final_url); identical in-flight requests share one fetch."""
+        url = urljoin(BASE_URL, url)
+        return self._inflight.do(url, self._get, url)
+
+    def _get(self, url):
+        start = perf_counter()
+        resp = self.session.get(url, timeout=self.timeout)
+        elapsed = perf_counter() - start
+        throttle.record_latency(elapsed, url)
+        throttle.record_status(resp.status_code)
+        log_message(f"🕒 Fetched {url!r} in {elapsed:.2f}s")
+        if resp.status_code == 429:
+            log_message(f"🚫 RATE LIMIT hit on {url} (429 Too Many Requests)")
+        resp.raise_for_status()
+        if "login.php" in resp.url:
+            raise SessionExpired("Saved session is no longer valid; log in again")
+        return resp.text, resp.url
+
+    def resolve_content(self, url):
+        """
+        (html, url) of the page MainView would show for `url`, served from
+        the prefetch store when it already has the page.
+        """
+        cached = self.store.lookup(url) if self.store else None
+        return cached or self.fetch_content(url)
+
+    def fetch_content(self, url):
+        """resolve_content() without the prefetch store."""
+        url = urljoin(BASE_URL, url)
+        direct = main_view_routes.resolve(url)
+        if direct:
+            try:
+                html, final_url = self.get(direct)
+                ok = not is_menu_shell(final_url) and main_view_routes.verify(url, html)
+                if main_view_routes.confirm(url, ok):
+                    return html, final_url
+            except requests.RequestException as e:
+                # timeouts and connection errors too, like the browser path
+                log_message(f"⚠️ Direct fetch of {direct!r} failed — {e}")
+                main_view_routes.confirm(url, False)
+
+        html, final_url = self.get(url)
+        if not is_menu_shell(final_url):
+            return html, final_url
+        src = parse_main_view_src(html)
+        if not src:
+            return html, final_url
+        content_url = urljoin(final_url, src)
+        main_view_routes.learn(url, content_url)
+        return self.get(content_url)
+
+    def get_content(self, url):
+        return self.resolve_content(url)[0]
+
+    def due_consultation_tasks(self):
+        log_message(f"\n🔎 Fetching task list: {TASK_URL}")
+        due = filter_due_consultation_tasks(parse_task_list_html(self.get_content(TASK_URL)))
+        log_message(f"✅ Found {len(due)} due consultation tasks.", also_print=True)
+        return due
+
+    def load_task_page(self, url):
+        log_message(f"\n🔎 Fetching task URL: {url}")
+        html, content_url = self.resolve_content(url)
+        # html and content_url are kept for submit_task_form()
+        return parse_task_page_html(html)._replace(html=html, content_url=content_url)
+
+    def submit_task_form(self, plan, summary_text, is_free):
+        """
+        HTTP twin of finalize_task(): send the TOSSTask form in one request,
+        then re-read the task to confirm the notes landed. Returns False (and
+        the caller falls back to the UI, which re-checks for existing notes)
+        when the form can't be rebuilt, the server rejects it or the notes
+        don't show up.
+        """
+        task_id = plan.task_id
+        post = build_task_form_post(plan.html, plan.content_url,
+                                    task_id, summary_text, is_free)
+        if not post:
+            log_message(f"⚠️ Could not rebuild form for Task {task_id}; using the UI")
+            return False
+
+        method, action, fields = post
+        try:
+            start = perf_counter()
+            if method == "post":
+                resp = self.session.post(action, data=fields, timeout=self.timeout)
+            else:
+                resp = self.session.get(action, params=fields, timeout=self.timeout)
+            log_message(f"🕒 Submitted Task {task_id} form in {perf_counter() - start:.2f}s")
+        except requests.RequestException as e:
+            log_message(f"❌ HTTP submit failed for task {task_id}: {e}")
+            return False
+
+        if not resp.ok or "login.php" in resp.url:
+            log_message(f"❌ HTTP submit for task {task_id} returned {resp.status_code} ({resp.url})")
+            return False
+
+        # a 200 only says the server answered; read the task back to be sure
+        try:
+            html, _ = self.get(plan.content_url)
+        except requests.RequestException as e:
+            log_message(f"❌ Could not re-read task {task_id} after HTTP submit: {e}")
+            return False
+        if not parse_task_page_html(html).has_notes:
+            log_message(f"❌ Task {task_id} shows no notes after HTTP submit; using the UI")
+            return False
+
+        log_message(f"✅ Task {task_id} successfully finalized over HTTP")
+        return True
+
+    def dispatch_summary(self, ci, customers=None, wo_cache=None):
+        """HTTP twin of format_dispatch_summary()."""
+        if not ci or not ci.ticket:
+            return None
+
+        wo_rows = customers.get(ci.cid) if customers else None
+        if wo_rows is None:
+            wo_rows = parse_work_order_rows_html(self.get_content(ci.customer_url))
+            if customers:
+                customers.put(ci.cid, wo_rows)
+        wo_url, wo_number = pick_dispatch_work_order(wo_rows, ci.ticket)
+        if not wo_url:
+            log_message(f"⚠️ No dispatch WOs found for Ticket #{ci.ticket}")
+            return None
+
+        wo = wo_cache.get(wo_number) if wo_cache else None
+        if wo is None:
+            wo = make_work_order_snapshot(parse_work_order_html(self.get_content(wo_url)))
+            if wo_cache:
+                wo_cache.put(wo_number, wo)
+        log_message(f"WO {wo_number} status → {wo.status!r}")
+        if wo.status not in ("complete", "completed"):
+            log_message(f"⚠️ WO {wo_number} is still uncompleted; skipping")
+            return None
+
+        summary_text = build_dispatch_summary(ci, wo_number, wo_url, wo)
+        log_message(summary_text)
+        return summary_text
+
+class PrefetchStore:
+    """
+    Lookahead stage: background HTTP workers fetch the next tasks' task,
+    customer and WO pages while the current task is being written, so
+    network time overlaps with the write phase. Pages are kept in memory
+    as (html, url) keyed by the requested URL, and the notes of fetched
+    task pages are kept so their job types can be classified as a batch.
+    """
+    def __init__(self, reader, lookahead: int = 3, workers: int = 4):
+        self.reader = reader
+        self.lookahead = lookahead
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._pages = {}        # url → Future[(html, url)]
+        self._owned = {}        # task url → per-task page urls, for release()
+        self._released = set()  # task urls whose pages must not be kept
+        self._notes = {}        # task url → notes of its fetched task page
+        self._scheduled = set()
+        self.hits = self.misses = 0
+
+    def _load(self, url, owner=None):
+        """
+        (html, url) for `url`; the first caller fetches and concurrent
+        callers wait on the same future. A page loaded for task `owner` is
+        registered to it before fetching, so release(owner) always frees it;
+        once the owner is released, None is returned and nothing is kept.
+        """
+        with self._lock:
+            if owner is not None:
+                if owner in self._released:
+                    return None
+                owned = self._owned.setdefault(owner, [])
+                if url not in owned:
+                    owned.append(url)
+            fut = self._pages.get(url)
+            owner = fut is None
+            if owner:
+                fut = self._pages[url] = Future()
+        if owner:
+            try:
+                fut.set_result(self.reader.fetch_content(url))
+            except Exception as e:
+                fut.set_exception(e)
+        return fut.result()
+
+    def _prefetch_task(self, task):
+        url = task.url
+        try:
+            loaded = self._load(url, owner=url)
+            if loaded is None:
+                return
+            plan = parse_task_page_html(loaded[0])
+            with self._lock:
+                if url not in self._released:
+                    self._notes[url] = plan.notes
+            ci = plan.ci
+            if not ci or not ci.ticket:
+                return
+            rows = parse_work_order_rows_html(self._load(ci.customer_url)[0])
+            wo_url, _ = pick_dispatch_work_order(rows, ci.ticket)
+            if wo_url:
+                self._load(wo_url, owner=url)
+        except Exception as e:
+            log_message(f"⚠️ Prefetch for {url} stopped: {e}")
+
+    def notes(self, tasks):
+        """Notes of the task pages among `tasks` that are already fetched."""
+        with self._lock:
+            return [self._notes[task.url] for task in tasks if task.url in self._notes]
+
+    def schedule(self, tasks):
+        for task in tasks:
+            if task.url not in self._scheduled:
+                self._scheduled.add(task.url)
+                self._pool.submit(self._prefetch_task, task)
+
+    def lookup(self, url):
+        """(html, url) if the page was (or is being) prefetched, else None."""
+        with self._lock:
+            fut = self._pages.get(url)
+        if fut is None:
+            self.misses += 1
+            return None
+        try:
+            result = fut.result(timeout=self.reader.timeout * 2)
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def release(self, task_url):
+        """
+        Drop a finished task's own pages; shared customer pages stay. Pages
+        a worker is still about to load for it are skipped (see _load()).
+        """
+        with self._lock:
+            self._released.add(task_url)
+            self._notes.pop(task_url, None)
+            for url in self._owned.pop(task_url, []):
+                self._pages.pop(url, None)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        log_message(f"📦 Prefetch: {self.hits} hit(s), {self.misses} miss(es), "
+                    f"{self.reader._inflight.shared} shared fetch(es)")
+
+
+# === Sharded Runner ===
+SHARD_CUSTOMER_COST = 2.0   # customer + WO table lookup, paid once per company
+SHARD_TASK_COST     = 3.0   # task page, WO page, finalize
+
+def shard_tasks(due_tasks, workers):
+    """
+    Split due tasks into `workers` shards balanced by predicted cost.
+    Tasks are grouped by the task list's company column, the closest thing
+    to a customer before the task page (and its CID) is read, so shared
+    lookups tend to stay in one process. A group costing more than a fair
+    shard is cut into pieces that fit one; groups are then placed
+    largest-first onto the currently lightest shard.
+    """
+    groups = defaultdict(list)
+    for task in due_tasks:
+        groups[(task.company or "").strip().lower()].append(task)
+
+    workers = max(1, workers)
+    cost = lambda g: SHARD_CUSTOMER_COST + SHARD_TASK_COST * len(g)
+    fair = sum(cost(g) for g in groups.values()) / workers
+    # largest piece whose cost stays within a fair shard (at least one task)
+    piece = max(1, int((fair - SHARD_CUSTOMER_COST) // SHARD_TASK_COST))
+    pieces = []
+    for group in groups.values():
+        if cost(group) <= fair:
+            pieces.append(group)
+        else:
+            pieces.extend(group[i:i + piece] for i in range(0, len(group), piece))
+
+    shards = [[] for _ in range(workers)]
+    heap = [(0.0, i) for i in range(workers)]
+    for group in sorted(pieces, key=cost, reverse=True):
+        load, i = heapq.heappop(heap)
+        shards[i].extend(group)
+        heapq.heappush(heap, (load + cost(group), i))
+    return [shard for shard in shards if shard]
+
+def _shard_worker(index, tasks, headless=True, http_reads=False, prefetch=0, use_cache=True):
+    """
+    Runs in a child process: own Playwright, own browser, saved session.
+    With http_reads the browser is only launched if a write needs the UI.
+    """
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    if http_reads:
+        driver = LazyDriver(headless=headless)
+    else:
+        driver = PlaywrightDriver(headless=headless)
+        attach_network_listeners(driver.page)
+    try:
+        results, errors = process_tasks(
+            driver, tasks, desc=f"Worker {index + 1}", position=index,
+            reader=HttpReader() if http_reads else None,
+            prefetch=prefetch,
+            use_cache=use_cache,
+        )
+    finally:
+        driver.close()
+        driver.policy.report()
+        main_view_routes.report()
+    return results, errors, Counter(r["Job Type"] for r in results)
+
+def run_sharded(due_tasks, workers, headless=True, http_reads=False, prefetch=0,
+                use_cache=True):
+    """
+    Process `due_tasks` across `workers` processes and merge their output
+    into the same (results, errors) pair as run_with_progress().
+    """
+    shards = shard_tasks(due_tasks, workers)
+    log_message(
+        f"🧩 Split {len(due_tasks)} tasks into {len(shards)} shard(s): "
+        + ", ".join(str(len(s)) for s in shards),
+        also_print=True,
+    )
+
+    results, errors = [], []
+    job_counts = Counter()
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(shards) or 1, mp_context=ctx) as pool:
+        futures = {
+            pool.submit(_shard_worker, i, shard, headless, http_reads, prefetch, use_cache): i
+            for i, shard in enumerate(shards)
+        }
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                shard_results, shard_errors, shard_counts = fut.result()
+            except Exception as e:
+                # a dead worker fails its whole shard; keep the others
+                tb = traceback.format_exc()
+                log_message(f"❌ Worker {i + 1} crashed — {e}", also_print=True)
+                log_message(tb)
+                errors.extend(
+                    {"Task": task, "Error": str(e), "Traceback": tb}
+                    for task in shards[i]
+                )
                 continue
+            results.extend(shard_results)
+            errors.extend(shard_errors)
+            job_counts.update(shard_counts)
+            log_message(f"✅ Worker {i + 1} finished: {len(shard_results)} done, "
+                        f"{len(shard_errors)} errors")
+
+    log_message(f"🧮 Merged job types: {dict(job_counts)}")
+    return results, errors
+
+# === Concurrent Engine ===
+MAX_CONCURRENCY = 16
+
+async def _async_goto(page, url, **kwargs):
+    start = perf_counter()
+    direct = main_view_routes.resolve(url)
+    response = None
+    if direct:
+        try:
+            response = await page.goto(direct, **kwargs)
+        except PlaywrightError as e:
+            log_message(f"⚠️ Direct load of {direct!r} failed — {e}")
+    ok = response is not None and response.ok and "login.php" not in page.url
+    if ok:
+        try:
+            ok = main_view_routes.verify(url, await page.content())
+        except PlaywrightError:
+            ok = False
+    if not direct or not main_view_routes.confirm(url, ok):
+        await page.goto(url, **kwargs)
+        frame = page.frame(name="MainView")
+        if frame and frame.url.startswith("http"):
+            main_view_routes.learn(url, frame.url)
+    elapsed = perf_counter() - start
+    throttle.record_latency(elapsed, url)
+    log_message(f"🕒 Navigated to {url!r} in {elapsed:.2f}s")
+
+async def _async_main_view(page, timeout=10_000):
+    if not is_menu_shell(page.url):
+        return page.main_frame
+    try:
+        await page.wait_for_selector("iframe#MainView", timeout=timeout)
+    except PlaywrightTimeout:
+        pass
+    return page.frame(name="MainView") or page.main_frame
+
+async def _async_expand_task(frame, task_id):
+    span_sel   = f"#displaySpan{task_id}"
+    legend_sel = f"{span_sel} >> xpath=ancestor::fieldset[1]//legend"
+    try:
+        legend = frame.locator(legend_sel)
+        await legend.wait_for(timeout=5_000)
+        if not await frame.locator(span_sel).is_visible():
+            await legend.scroll_into_view_if_needed(timeout=5_000)
+            await legend.click(force=True)
+            await frame.wait_for_selector(f"{span_sel}:not([style*='display:none'])",
+                                          timeout=5_000)
+        log_message(f"✅ Task {task_id} expanded")
+    except Exception as e:
+        log_message(f"❌ expand_task(): Unexpected error expanding {task_id} → {e}")
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of SingleFlight: tasks asking for the same key
+    while a load is running await that load instead of starting another.
+    """
+    def __init__(self):
+        self._calls = {}        # key → asyncio.Task
+        self.shared = 0
+
+    async def do(self, key, factory):
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared += 1
+        # shield: a cancelled waiter must not cancel the others' load
+        return await asyncio.shield(task)
+
+async def _async_read_work_order_rows(page, customer_url):
+    await _async_goto(page, customer_url, wait_until="load")
+    frame = await _async_main_view(page)
+    try:
+        await frame.wait_for_selector("#custWork #workShow table tr", timeout=10_000)
+    except PlaywrightTimeout:
+        return None
+    return parse_work_order_rows_html(await frame.content())
+
+async def _async_read_work_order(page, wo_url):
+    await _async_goto(page, wo_url)
+    await page.wait_for_selector("#AdditionalNotes", state="attached", timeout=10_000)
+    return make_work_order_snapshot(parse_work_order_html(await page.content()))
+
+async def _async_dispatch_summary(page, ci, customers, wo_cache, inflight):
+    """
+    Async twin of format_dispatch_summary(); `page` is the lookup tab that
+    visits the customer and WO pages. Loads already in flight for another
+    task are shared through `inflight`.
+    """
+    if not ci or not ci.ticket:
+        return None
+    ticket = ci.ticket
+
+    wo_rows = customers.get(ci.cid)
+    if wo_rows is None:
+        wo_rows = await inflight.do(
+            ci.customer_url,
+            lambda: _async_read_work_order_rows(page, ci.customer_url))
+        if wo_rows is None:
+            log_message(f"⚠️ No Work Orders table found for ticket {ticket}")
+            return None
+        customers.put(ci.cid, wo_rows)
+    wo_url, wo_number = pick_dispatch_work_order(wo_rows, ticket)
+    if not wo_url:
+        log_message(f"⚠️ No dispatch WOs found for Ticket #{ticket}")
+        return None
+
+    wo = wo_cache.get(wo_number) if wo_cache else None
+    if wo is None:
+        wo = await inflight.do(wo_url, lambda: _async_read_work_order(page, wo_url))
+        if wo_cache:
+            wo_cache.put(wo_number, wo)
+    log_message(f"WO {wo_number} status → {wo.status!r}")
+    if wo.status not in ("complete", "completed"):
+        log_message(f"⚠️ WO {wo_number} is still uncompleted; skipping")
+        return None
+
+    summary_text = build_dispatch_summary(ci, wo_number, wo_url, wo)
+    log_message(summary_text)
+    return summary_text
+
+async def _async_finalize_task(frame, task_id, summary_text, is_free):
+    try:
+        await frame.wait_for_selector(f"form#TOSSTask{task_id}", timeout=10_000)
+        notes_sel = f"#txtNotes{task_id}"
+        await frame.wait_for_selector(notes_sel, timeout=10_000)
+        await frame.fill(notes_sel, summary_text)
+
+        if not is_free:
+            billing = frame.locator('input[name="SpawnBillingTask"]')
+            await billing.wait_for(timeout=5_000)
+            if not await billing.is_checked():
+                await billing.check()
+
+        completed = frame.locator(f"#completedcheck{task_id}")
+        await completed.wait_for(timeout=5_000)
+        if not await completed.is_checked():
+            await completed.check()
+
+        await frame.click(f"#sub_{task_id}")
+        log_message(f"✅ Task {task_id} successfully finalized")
+        return True
+    except Exception as e:
+        log_message(f"❌ Error in finalize_task for task {task_id}: {e}")
+        return False
 
-            # 4) format summary
-            summary_text = format_dispatch_summary(driver)
+async def _async_process_task(pool, task, results, errors, pbar, customers, wo_cache,
+                              inflight, classifier):
+    async with throttle:
+        refresh_rules()
+        slot = None
+        try:
+            slot = await pool.checkout()
+            page, lookup = slot
+
+            # 1) parse job type
+            log_message(f"\n🔎 Opening task URL: {task.url}")
+            await _async_goto(page, task.url)
+            frame = await _async_main_view(page)
+            await frame.wait_for_selector("[name=Notes]", timeout=10_000)
+            plan = parse_task_page_html(await frame.content())
+            job_type = job_type_from_notes(plan.notes)
+            is_free = classifier.is_free(job_type)
+
+            # 2) expand & skip if notes already exist
+            task_id = plan.task_id
+            await _async_expand_task(frame, task_id)
+            if plan.has_notes:
+                log_message(f"⏭️ Task {task_id} already has notes, skipping")
+                return
+
+            # 3) format summary in the lookup tab; the task form stays loaded
+            summary_text = await _async_dispatch_summary(lookup, plan.ci, customers,
+                                                         wo_cache, inflight)
             if not summary_text:
                 log_message(f"⚠️ No summary for Task {task_id}, skipping")
-                continue
+                return
 
-
-            driver.goto(task["url"])
-            frame = driver.frame(name="MainView") or driver.main_frame()
-            expand_task(frame, task_id)
-            # 5) finalize in one shot
-            success = finalize_task(driver.page, task_id, summary_text, is_free)
-            if success:
+            # 4) finalize
+            if await _async_finalize_task(frame, task_id, summary_text, is_free):
                 mode = "Free" if is_free else "Billable"
                 log_message(f"✔️ Task {task_id} {mode} completed")
                 results.append({
-                    "Company":     task["company"],
-                    "Description": task["desc"],
-                    "URL":         task["url"],
+                    "Company":     task.company,
+                    "Description": task.desc,
+                    "URL":         task.url,
                     "Job Type":    job_type,
                     "Task ID":     task_id,
                     "Mode":        mode
                 })
             else:
                 log_message(f"⚠️ Failed to finalize Task {task_id}")
-                debug_frame_html(driver)
 
         except Exception as e:
             tb = traceback.format_exc()
             errors.append({"Task": task, "Error": str(e), "Traceback": tb})
-            log_message(f"❌ Error for {task['desc']} — {e}")
+            log_message(f"❌ Error for {task.desc} — {e}")
             log_message(tb)
+        finally:
+            if slot is not None:
+                try:
+                    await pool.checkin(slot)
+                except PlaywrightError as e:
+                    log_message(f"⚠️ Could not return browser context to the pool — {e}")
+            pbar.update(1)
+
+async def _async_dismiss_dialog(dialog):
+    await dialog.dismiss()
+
+class AsyncContextPool:
+    """
+    Pre-warmed browser contexts for the async engine, all loaded from the
+    same storage state. A slot is one context with a task page and a
+    lookup page; tasks checkout() a slot and checkin() it when done.
+    Slots are health-checked both ways: closed pages, a failed round trip
+    or a context built from an older state file get recycled. Beyond
+    `size`, extra slots are made on demand and closed again on checkin.
+    """
+    def __init__(self, browser, policy, size: int = 4, state_path: str = STATE_PATH):
+        self.browser = browser
+        self.policy = policy
+        self.size = max(1, size)
+        self.state_path = state_path
+        self._idle = deque()
+        self._state_mtime = {}
+        self.recycled = 0
+
+    async def start(self):
+        self._idle.extend(await asyncio.gather(*(self._new_slot() for _ in range(self.size))))
+
+    def _current_state_mtime(self):
+        try:
+            return os.path.getmtime(self.state_path)
+        except OSError:
+            return None
+
+    async def _new_slot(self):
+        if Path(self.state_path).exists():
+            context = await self.browser.new_context(storage_state=self.state_path)
+        else:
+            context = await self.browser.new_context()
+        try:
+            context.on("dialog", _async_dismiss_dialog)
+            await context.add_init_script(script=OVERLAY_OBSERVER_JS)
+            context.on("response", self.policy.record_response)
+            await context.route("**/*", self.policy.handle_async)
+            slot = (await context.new_page(), await context.new_page())
+        except PlaywrightError:
+            await context.close()
+            raise
+        for page in slot:
+            attach_network_listeners(page)
+        self._state_mtime[context] = self._current_state_mtime()
+        return slot
+
+    async def is_healthy(self, slot):
+        # a slot built from an older state file would miss a fresh login
+        if self._state_mtime.get(slot[0].context) != self._current_state_mtime():
+            return False
+        try:
+            for page in slot:
+                if page.is_closed() or await page.evaluate("1") != 1:
+                    return False
+        except PlaywrightError:
+            return False
+        return True
+
+    async def _discard(self, slot):
+        context = slot[0].context
+        self._state_mtime.pop(context, None)
+        try:
+            await context.close()
+        except PlaywrightError:
+            pass
 
+    async def checkout(self):
+        while self._idle:
+            slot = self._idle.popleft()
+            if await self.is_healthy(slot):
+                return slot
+            log_message("♻️ Recycling unhealthy browser context")
+            self.recycled += 1
+            await self._discard(slot)
+        # pool exhausted → hand out an extra one; checkin() trims it back
+        return await self._new_slot()
+
+    async def checkin(self, slot):
+        if len(self._idle) >= self.size or not await self.is_healthy(slot):
+            await self._discard(slot)
+            if len(self._idle) < self.size:
+                self._idle.append(await self._new_slot())
+            return
+        self._idle.append(slot)
+
+    async def close(self):
+        while self._idle:
+            await self._discard(self._idle.popleft())
+
+async def _run_concurrent(due_tasks, concurrency, max_concurrency, headless, use_cache,
+                          pool_size):
+    results, errors = [], []
+    customers = CustomerCache()
+    classifier = JobTypeClassifier(ClassificationMemo() if use_cache else None)
+    wo_cache = WorkOrderCache() if use_cache else None
+    inflight = AsyncSingleFlight()
+    throttle.reset(concurrency, max_concurrency)
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=headless)
+        policy = RequestPolicy()
+        pool = AsyncContextPool(browser, policy, size=pool_size)
+        try:
+            await pool.start()
+            with tqdm(total=len(due_tasks), desc="Processing consultation tasks",
+                      unit="task") as pbar:
+                # one task failing outside its own error handling must not
+                # cancel the rest; it is recorded like any other task error
+                outcomes = await asyncio.gather(*(
+                    _async_process_task(pool, task, results, errors, pbar,
+                                        customers, wo_cache, inflight, classifier)
+                    for task in due_tasks
+                ), return_exceptions=True)
+            for task, outcome in zip(due_tasks, outcomes):
+                if isinstance(outcome, BaseException):
+                    tb = "".join(traceback.format_exception(type(outcome), outcome,
+                                                          outcome.__traceback__))
+                    errors.append({"Task": task, "Error": str(outcome), "Traceback": tb})
+                    log_message(f"❌ Error for {task.desc} — {outcome}")
+        finally:
+            throttle.stop()
+            await pool.close()
+            await browser.close()
+    if pool.recycled:
+        log_message(f"♻️ Recycled {pool.recycled} browser context(s)")
+    policy.report()
+    customers.report()
+    throttle.report()
+    log_message(f"🔗 {inflight.shared} page load(s) shared between tasks")
+    classifier.close()
+    if wo_cache:
+        wo_cache.close()
     return results, errors
 
+def run_concurrent(due_tasks, concurrency=4, headless=True, use_cache=True,
+                   max_concurrency=MAX_CONCURRENCY, pool_size=None):
+    """
+    Process `due_tasks` using the async Playwright API and the session saved
+    in STATE_PATH. `concurrency` pages start in flight; the throttle then
+    grows that towards `max_concurrency` while the site keeps up and backs
+    off on 429s or slower p95 navigation times. Tasks run in contexts from
+    an AsyncContextPool of `pool_size` warm slots (default: `concurrency`).
+    Returns the same (results, errors) pair as run_with_progress().
+    """
+    pool_size = pool_size or concurrency
+    log_message(f"🚀 Processing {len(due_tasks)} tasks with concurrency={concurrency} "
+                f"(max {max_concurrency}, {pool_size} warm context(s))", also_print=True)
+    return asyncio.run(_run_concurrent(due_tasks, concurrency, max_concurrency,
+                                       headless, use_cache, pool_size))
+
 def debug_frame_html(driver):
     """
     Prints the URL and outerHTML of whichever frame we're in
     (MainView if present, otherwise main_frame).
     """
     try:
-        # try to grab the MainView iframe
-        iframe_el = driver.wait_for_selector('iframe#MainView', timeout=5_000)
-        frame = iframe_el.content_frame()
-    except TimeoutError:
-        frame = driver.main_frame()
+        frame = driver.main_view(timeout=5_000)
+    except PlaywrightTimeout:
+        frame = driver.page.main_frame
 
     print(f"\n[DEBUG] Frame URL: {frame.url}\n")
 
@@ -1104,6 +3019,7 @@ def check_for_update():
     return
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     parser = argparse.ArgumentParser()
     parser.add_argument(
         '--update',
@@ -1115,7 +3031,70 @@ if __name__ == "__main__":
         action='store_true',
         help="Print current version and exit"
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help="Number of tasks to process at once (async engine when > 1)"
+    )
+    parser.add_argument(
+        '--benchmark',
+        action='store_true',
+        help="Time task-list extraction paths and exit"
+    )
+    parser.add_argument(
+        '--http-reads',
+        action='store_true',
+        help="Read pages over HTTP with the saved session; use the browser only to write"
+    )
+    parser.add_argument(
+        '--benchmark-parse',
+        metavar='DIR',
+        help="Parse saved HTML pages in DIR offline, report pages/s and exit"
+    )
+    parser.add_argument(
+        '--prefetch',
+        type=int,
+        default=0,
+        metavar='K',
+        help="Fetch the next K tasks' pages over HTTP in the background"
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=MAX_CONCURRENCY,
+        help="Upper bound the adaptive throttle may raise --concurrency to"
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=int,
+        default=None,
+        metavar='N',
+        help="Browser contexts the async engine keeps warm (default: --concurrency)"
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Ignore the on-disk caches of completed work orders and job-type classifications"
+    )
+    parser.add_argument(
+        '--calibrate-blocking',
+        action='store_true',
+        help="Let blocked requests through once to measure their sizes (sequential runs)"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help="Number of worker processes, each with its own browser"
+    )
     args, remaining = parser.parse_known_args()
+    if args.concurrency > 1:
+        # the async engine drives its own browser contexts end to end
+        if args.http_reads or args.prefetch:
+            parser.error("--concurrency can't be combined with --http-reads or --prefetch")
+        if args.workers > 1:
+            parser.error("--concurrency and --workers are separate engines; pick one")
 
     if args.version:
         print(__version__)
@@ -1124,31 +3103,83 @@ if __name__ == "__main__":
     if args.update:
         check_for_update()
         sys.exit(0)
+
+    if args.benchmark_parse:
+        benchmark_parsers(args.benchmark_parse, log=lambda msg: log_message(msg, True))
+        sys.exit(0)
     signal.signal(signal.SIGTERM, handle_sigterm)
     os.environ["PLAYWRIGHT_BROWSERS_PATH"] = BROWSERS
     print(f"PLAYWRIGHT_BROWSERS_PATH set to {BROWSERS}")
-    ensure_playwright()
+    launched = ensure_playwright()
 
     # clear log
     with open(LOG_FILE, "w", encoding="utf-8"):
         pass
     
-    PW = sync_playwright().start()
-    browser = PW.chromium.launch(headless=True)
+    if launched:
+        # the startup probe already paid for a cold start; keep its browser
+        PW, browser = launched
+    else:
+        PW = sync_playwright().start()
+        try:
+            browser = PW.chromium.launch(headless=True)
+        except PlaywrightError:
+            # manifest vouched for a browser that no longer launches
+            PW.stop()
+            os.remove(CHROMIUM_MANIFEST)
+            PW, browser = ensure_playwright()
 
     try:
         driver = PlaywrightDriver(
             headless=True,
             playwright=PW,
             browser=browser,
+            policy=RequestPolicy(calibrate=args.calibrate_blocking),
         )
         page = driver.page
         attach_network_listeners(page)
         handle_login(driver)
         clear_first_time_overlays(driver.page)
 
-        results, errors = run_with_progress(driver, complete_free=True)
+        if args.benchmark:
+            benchmark_task_extraction(driver)
+            sys.exit(0)
+
+        if args.workers > 1 or args.concurrency > 1:
+            due_tasks = extract_due_consultation_tasks(driver)
+            driver.save_state()
+            # the other engines run their own browsers; release this one first
+            driver.close()
+            if args.workers > 1:
+                results, errors = run_sharded(due_tasks, workers=args.workers,
+                                              http_reads=args.http_reads,
+                                              prefetch=args.prefetch,
+                                              use_cache=not args.no_cache)
+            else:
+                results, errors = run_concurrent(due_tasks, concurrency=args.concurrency,
+                                                 use_cache=not args.no_cache,
+                                                 max_concurrency=args.max_concurrency,
+                                                 pool_size=args.pool_size)
+        elif args.http_reads:
+            driver.save_state()
+            # reads and most writes go over HTTP; relaunch only for UI fallbacks
+            driver.close()
+            driver = LazyDriver(policy=driver.policy)
+            reader = HttpReader()
+            results, errors = process_tasks(driver, reader.due_consultation_tasks(),
+                                            reader=reader, prefetch=args.prefetch,
+                                            use_cache=not args.no_cache)
+        elif args.prefetch > 0:
+            due_tasks = extract_due_consultation_tasks(driver)
+            driver.save_state()
+            results, errors = process_tasks(driver, due_tasks, prefetch=args.prefetch,
+                                            use_cache=not args.no_cache)
+        else:
+            results, errors = run_with_progress(driver, complete_free=True,
+                                                use_cache=not args.no_cache)
         log_message(f"\n✅ Done. Parsed {len(results)} tasks with {len(errors)} errors.", True)
+        driver.policy.report()
+        main_view_routes.report()
         summarize_job_types(results)
 
     except KeyboardInterrupt:
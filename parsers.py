@@ -0,0 +1,424 @@
+"""
+Pure parsers for the pages the crusher scrapes (raw HTML str or bytes in,
+typed records out) and the keyword matcher run over their notes. Nothing
+here touches the network, a browser or the filesystem on import, so pages
+can be parsed and benchmarked offline:
+
+    python parsers.py DIR
+"""
+import re
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import NamedTuple, Optional
+from urllib.parse import urljoin
+
+import lxml.html
+
+WORK_ORDER_NOTE_FIELDS = ("EquipmentInstalled", "AdditionalMaterials",
+                          "TestsPerformed", "AdditionalNotes")
+
+
+# === Records ===
+class TaskRow(NamedTuple):
+    """One row of the task list."""
+    url: Optional[str]
+    desc: str
+    due: str
+    assigned: str
+    company: str
+
+class CustomerInfo(NamedTuple):
+    """Customer and dispatch ticket a task page refers to."""
+    customer_name: str
+    cid: str
+    ticket: Optional[str]
+    customer_url: str
+
+class TaskPage(NamedTuple):
+    """
+    What the pipeline needs from a task page. `html` and `content_url`
+    are only filled in by the HTTP path, which replays the form from them.
+    """
+    notes: str
+    task_id: Optional[str]
+    has_notes: bool
+    ci: Optional[CustomerInfo]
+    html: Optional[str] = None
+    content_url: Optional[str] = None
+
+class WorkOrderRow(NamedTuple):
+    """One row of a customer page's Work Orders table."""
+    number: str
+    description: str
+    href: Optional[str]
+
+class WorkOrderFields(NamedTuple):
+    """Raw work-order page values, None where the page lacks the field."""
+    status: str
+    arr_date: Optional[str]
+    arr_time: Optional[str]
+    dep_date: Optional[str]
+    dep_time: Optional[str]
+    fields: dict
+
+class WorkOrder(NamedTuple):
+    """
+    Normalised work-order snapshot: lowercased status, stripped times, the
+    note `fields` and their `combined` text.
+    """
+    status: str
+    arr_date: str
+    arr_time: str
+    dep_date: str
+    dep_time: str
+    fields: dict
+    combined: str
+
+class RecordIds(NamedTuple):
+    """Task and customer IDs a content page shows, None where absent."""
+    task_id: Optional[str]
+    cid: Optional[str]
+
+
+# === Helpers ===
+def parse_html(html):
+    """lxml (libxml2) document from a raw HTML str or bytes."""
+    if isinstance(html, str):
+        try:
+            return lxml.html.fromstring(html or "<html></html>")
+        except ValueError:
+            # str input that still carries an XML encoding declaration
+            html = html.encode("utf-8")
+    return lxml.html.fromstring(html or b"<html></html>")
+
+def _html_text(el):
+    return " ".join(el.text_content().split()) if el is not None else ""
+
+def _first(doc, xpath):
+    found = doc.xpath(xpath)
+    return found[0] if found else None
+
+def customer_url_for(cid):
+    return (
+        "http://inside.sockettelecom.com/menu.php"
+        f"?coid=1&tabid=7&parentid=9&customerid={cid}"
+    )
+
+def span_has_notes(html):
+    # grab everything in the span *before* the <form> tag
+    before_form = html.split("<form", 1)[0]
+    # strip out any tags and whitespace
+    plain = re.sub(r"<[^>]+>", "", before_form).strip()
+    return bool(plain)
+
+
+# === Page Parsers ===
+def parse_task_list_html(html):
+    """TaskRow for every row of the task list's MainView HTML."""
+    doc = parse_html(html)
+    rows = []
+    for tr in doc.xpath("//tr[contains(@class,'taskElement')]"):
+        tds = tr.xpath(".//td")
+        if len(tds) < 6:
+            continue
+        link = _first(tds[0], ".//a")
+        due = _first(tr, ".//td[count(preceding-sibling::*) = 3]//nobr")
+        rows.append(TaskRow(
+            url=link.get("href") if link is not None else None,
+            desc=_html_text(tds[1]),
+            due=_html_text(due),
+            assigned=_html_text(tds[4]),
+            company=_html_text(tds[5]),
+        ))
+    return rows
+
+def _task_id(doc):
+    task_el = _first(doc, "//*[@name='nTaskID']")
+    if task_el is None:
+        return None
+    return (task_el.get("value") or "").strip() or None
+
+def _customer_id(doc):
+    return _html_text(_first(
+        doc, "//td[normalize-space(text())='Customer ID']/following-sibling::td/b")) or None
+
+def parse_task_page_html(html):
+    """
+    TaskPage with everything load_task_page() captures, from a task's
+    MainView HTML: notes, task_id, has_notes and the CustomerInfo `ci`.
+    """
+    doc = parse_html(html)
+
+    notes_el = _first(doc, "//*[@name='Notes']")
+    task_id = _task_id(doc)
+
+    has_notes = False
+    span = _first(doc, f"//*[@id='displaySpan{task_id}']") if task_id else None
+    if span is not None:
+        inner = (span.text or "") + "".join(
+            lxml.html.tostring(child, encoding="unicode") for child in span
+        )
+        has_notes = span_has_notes(inner)
+
+    cid = _customer_id(doc)
+    name = _html_text(_first(doc, "//td[normalize-space(text())='Customer Name']/following-sibling::td/b"))
+    dispatch = _html_text(_first(doc, "//b[contains(., 'Dispatch for Ticket')]"))
+    ci = None
+    if cid:
+        ci = CustomerInfo(
+            customer_name=name,
+            cid=cid,
+            ticket=dispatch.split()[-1] if dispatch else None,
+            customer_url=customer_url_for(cid),
+        )
+
+    return TaskPage(
+        notes=notes_el.value if notes_el is not None else "",
+        task_id=task_id,
+        has_notes=has_notes,
+        ci=ci,
+    )
+
+def parse_work_order_rows_html(html):
+    """WorkOrderRow for every row of a customer page's Work Orders table."""
+    doc = parse_html(html)
+    rows = []
+    for tr in doc.xpath("//*[@id='custWork']//*[@id='workShow']//table//tr"):
+        tds = tr.xpath(".//td")
+        if len(tds) < 5:
+            continue
+        link = _first(tds[4], ".//a")
+        rows.append(WorkOrderRow(_html_text(tds[0]), _html_text(tds[1]),
+                                 link.get("href") if link is not None else None))
+    return rows
+
+def parse_work_order_html(html):
+    """
+    WorkOrderFields of a work-order page, with None for anything missing;
+    make_work_order_snapshot() normalises them.
+    """
+    doc = parse_html(html)
+
+    def val(fid):
+        el = _first(doc, f"//*[@id='{fid}']")
+        return el.value if el is not None else None
+
+    status = _first(doc, "//td[@class='detailHeader' and normalize-space(text())='Status:']"
+                         "/following-sibling::td//span")
+    return WorkOrderFields(
+        status=_html_text(status),
+        arr_date=val("ArrivalOnsite"),
+        arr_time=val("ArrivalTime"),
+        dep_date=val("CompletedDate"),
+        dep_time=val("CompletedTime"),
+        fields={fid: val(fid) for fid in WORK_ORDER_NOTE_FIELDS},
+    )
+
+def page_record_ids(html):
+    """RecordIds a content page shows: its nTaskID input and Customer ID cell."""
+    doc = parse_html(html)
+    return RecordIds(task_id=_task_id(doc), cid=_customer_id(doc))
+
+def parse_main_view_src(html):
+    """The iframe#MainView src of a menu.php shell, or None."""
+    src = parse_html(html).xpath("//iframe[@id='MainView' or @name='MainView']/@src")
+    return src[0] if src else None
+
+
+# === Task Form ===
+def _is_submit_control(el):
+    if el.tag == "button":
+        return (el.get("type") or "submit").lower() == "submit"
+    return el.tag == "input" and (el.get("type") or "").lower() == "submit"
+
+def _form_fields(form):
+    """
+    (name, value) pairs a browser sends for `form` before any button is
+    clicked. Like lxml's form_values(), but also leaves out
+    <input type=button>, which browsers never submit.
+    """
+    fields = []
+    for el in form.inputs:
+        name = el.name
+        if not name or "disabled" in el.attrib:
+            continue
+        if el.tag == "textarea":
+            fields.append((name, el.value or ""))
+        elif el.tag == "select":
+            value = el.value
+            if el.multiple:
+                fields.extend((name, v) for v in value)
+            elif value is not None:
+                fields.append((name, value))
+        else:
+            if el.type in ("submit", "button", "image", "reset", "file"):
+                continue
+            if el.checkable and not el.checked:
+                continue
+            if el.value is not None:
+                fields.append((name, el.value))
+    return fields
+
+def build_task_form_post(html, base_url, task_id, summary_text, is_free):
+    """
+    Rebuild what clicking #sub_{task_id} would send: every submittable
+    field of form#TOSSTask{task_id} as the page serves it (hidden inputs
+    included, buttons left out), with the notes replaced, the completed /
+    billing boxes ticked and the submit button's own name=value. Returns
+    (method, action_url, fields), or None if the form isn't there or
+    #sub_{task_id} isn't a real submit control.
+    """
+    form = _first(parse_html(html), f"//form[@id='TOSSTask{task_id}']")
+    if form is None:
+        return None
+
+    notes = _first(form, f".//*[@id='txtNotes{task_id}']")
+    if notes is None or not notes.get("name"):
+        return None
+    fields = [(k, v) for k, v in _form_fields(form) if k != notes.get("name")]
+    fields.append((notes.get("name"), summary_text))
+
+    boxes = [_first(form, f".//*[@id='completedcheck{task_id}']")]
+    if not is_free:
+        boxes.append(_first(form, ".//input[@name='SpawnBillingTask']"))
+    for box in boxes:
+        if box is None or not box.get("name"):
+            return None
+        # _form_fields() already includes boxes that are checked by default
+        if box.get("checked") is None:
+            fields.append((box.get("name"), box.get("value") or "on"))
+
+    # only a real submit control can be replayed; a type=button one runs
+    # page script we can't reproduce, so leave that task to the UI
+    submit = _first(form, f".//*[@id='sub_{task_id}']")
+    if submit is None or not _is_submit_control(submit):
+        return None
+    pair = (submit.get("name"), submit.get("value") or "")
+    if pair[0] and pair not in fields:
+        fields.append(pair)
+
+    method = (form.get("method") or "get").lower()
+    return method, urljoin(base_url, form.get("action") or base_url), fields
+
+
+# === Notes Matching ===
+def _is_word_char(ch):
+    # what re's \w matches in str patterns
+    return ch.isalnum() or ch == "_"
+
+def _at_boundary(text, i):
+    # what re's \b matches at position i
+    before = i > 0 and _is_word_char(text[i - 1])
+    after = i < len(text) and _is_word_char(text[i])
+    return before != after
+
+class KeywordMatcher:
+    """
+    Matcher for ordered keyword rules: one compiled alternation of every
+    rule's keywords finds all hits in a single left-to-right scan, and the
+    hit from the earliest rule wins. Matching is case-insensitive;
+    whole-word rules need a word boundary on both sides.
+
+    Plays the part of an Aho-Corasick automaton without the dependency: a
+    bare literal alternation lets `re` skip ahead on first characters. A
+    leading \b would switch that off, so it is checked by hand.
+    """
+    def __init__(self, rules):
+        self.labels = []
+        # keyword → [(rule index, whole word, alternative index)]; the same
+        # keyword can appear once as a whole word and once as a substring
+        self._keywords = {}
+        alternatives = []
+        for index, (label, whole_word, keywords) in enumerate(rules):
+            self.labels.append(label)
+            for kw in keywords:
+                kw = kw.lower()
+                entries = self._keywords.setdefault(kw, [])
+                if any(ww == whole_word for _, ww, _ in entries):
+                    continue        # an earlier rule already wins every such hit
+                entries.append((index, whole_word, len(alternatives)))
+                alternatives.append(re.escape(kw) + (r"\b" if whole_word else ""))
+        self._scan = re.compile("|".join(alternatives)) if alternatives else None
+        # alternatives after each one, for when a whole-word hit fails its
+        # leading boundary and a later keyword may still match there
+        self._rest = [re.compile("|".join(alternatives[i + 1:]))
+                      for i in range(len(alternatives) - 1)] + [None]
+
+    def _matched(self, text, m, after):
+        # the alternative `m` came from: the first past `after` with this
+        # keyword whose trailing \b (if any) holds
+        for entry in self._keywords[m.group()]:
+            if entry[2] > after and (not entry[1] or _at_boundary(text, m.end())):
+                return entry
+        raise AssertionError("match without a matching alternative")
+
+    def hits(self, text):
+        """(position, rule index) for every position a keyword starts at."""
+        if self._scan is None:
+            return
+        text = text.lower()
+        pos = 0
+        while True:
+            m = self._scan.search(text, pos)
+            if m is None:
+                return
+            start = m.start()
+            after = -1
+            while m is not None:
+                index, whole_word, alt = self._matched(text, m, after)
+                if not whole_word or _at_boundary(text, start):
+                    yield start, index
+                    break
+                after = alt
+                rest = self._rest[alt]
+                m = rest.match(text, start) if rest else None
+            pos = start + 1
+
+    def first(self, text):
+        """Label of the earliest rule with a hit in `text`, or None."""
+        best = None
+        for _, index in self.hits(text):
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return None if best is None else self.labels[best]
+
+
+# === Benchmark ===
+HTML_PARSERS = {
+    "task_list": parse_task_list_html,
+    "task":      parse_task_page_html,
+    "customer":  parse_work_order_rows_html,
+    "wo":        parse_work_order_html,
+}
+
+def benchmark_parsers(directory, rounds=5, log=print):
+    """
+    Parse saved pages offline and report pages/second per parser, with no
+    network or browser involved. Files are matched to a parser by name
+    prefix: task_list*.html, task_*.html, customer_*.html, wo_*.html.
+    """
+    timings = {}
+    for kind, parser in HTML_PARSERS.items():
+        pages = [
+            p.read_bytes() for p in sorted(Path(directory).glob(f"{kind}*.html"))
+            if kind != "task" or not p.name.startswith("task_list")
+        ]
+        if not pages:
+            continue
+        start = perf_counter()
+        for _ in range(rounds):
+            for html in pages:
+                parser(html)
+        elapsed = perf_counter() - start
+        timings[kind] = len(pages) * rounds / elapsed if elapsed else float("inf")
+        log(f"  {kind:<9} {len(pages)} page(s): {timings[kind]:,.0f} pages/s")
+    return timings
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python parsers.py DIR")
+    benchmark_parsers(sys.argv[1])
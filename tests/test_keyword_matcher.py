@@ -0,0 +1,72 @@
+import random
+import re
+
+import pytest
+
+from parsers import KeywordMatcher
+
+# the job-type rules as the if-chain in job_type_from_notes() had them
+JOB_TYPE_RULES = [
+    ("Consultation",      False, ["courtesy dispatch", "no charge"]),
+    ("Phone Check",       True,  ["phone check", "jack", "fxs", "dial tone", "no dial tone"]),
+    ("Go-Live",           False, ["go live", "activate", "turn up"]),
+    ("Speed Test",        False, ["speed test", "throughput", "latency"]),
+    ("NID/IW/CopperTest", False, ["nid", "modem swap"]),
+]
+
+FILLER = ["customer", "onsite", "replaced", "ONT", "router", "the", "and", "tech",
+          "Jackson", "unidentified", "hijack", "jack_", "_jack", "nid-", "x", "1"]
+SEPARATORS = [" ", " ", " ", ", ", ".", "-", "_", "/", "\n", ""]
+
+
+def chain_first(rules, text):
+    """What the old if-chain returned: rules in order, first keyword hit wins."""
+    lower = text.lower()
+    for label, whole_word, keywords in rules:
+        for kw in keywords:
+            kw = kw.lower()
+            if whole_word:
+                if re.search(rf"\b{re.escape(kw)}\b", lower):
+                    return label
+            elif kw in lower:
+                return label
+    return None
+
+
+def make_notes(rng, keywords, count):
+    words = FILLER + keywords + [kw.upper() for kw in keywords]
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(0, 12)):
+            parts.append(rng.choice(words))
+            parts.append(rng.choice(SEPARATORS))
+        yield "".join(parts)
+
+
+def test_matches_if_chain_on_job_type_corpus():
+    matcher = KeywordMatcher(JOB_TYPE_RULES)
+    keywords = [kw for _, _, kws in JOB_TYPE_RULES for kw in kws]
+    rng = random.Random(21)
+    for note in make_notes(rng, keywords, 200_000):
+        assert matcher.first(note) == chain_first(JOB_TYPE_RULES, note), note
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_if_chain_on_random_rules(seed):
+    # repeated keywords with either flag, and keywords that start or end
+    # on non-word characters, as a hand-edited rules file may have them
+    rng = random.Random(seed)
+    pool = ["jack", "nid", "fxs", "go live", "/iw", "iw/", "a", "tone", "dial tone", "on"]
+    rules = [
+        (f"R{i}", rng.random() < 0.5, rng.sample(pool, rng.randint(1, 3)))
+        for i in range(rng.randint(1, 6))
+    ]
+    matcher = KeywordMatcher(rules)
+    for note in make_notes(rng, pool, 5_000):
+        assert matcher.first(note) == chain_first(rules, note), (rules, note)
+
+
+def test_same_keyword_with_both_flags():
+    matcher = KeywordMatcher([("A", True, ["jack"]), ("B", False, ["jack"])])
+    assert matcher.first("jackson") == "B"
+    assert matcher.first("a jack here") == "A"